@@ -1,13 +1,24 @@
 import os
+import hmac
+import json
 import secrets
-from flask import Flask, render_template, request, jsonify, session
+from eventlet import tpool
+from flask import Flask, Response, render_template, request, jsonify, session
 from flask_socketio import SocketIO, emit, join_room, leave_room
 from dotenv import load_dotenv
 
-from src.models import init_db, get_session as get_db_session, GameState, HandHistory
-from src.poker_engine import PokerGame, Card
-from src.cfr_strategy import CFRAgent, create_info_set, estimate_hand_equity
+from src.models import init_db, get_session as get_db_session, GameState, HandHistory, MerkleProof
+from src.poker_engine import PokerGame, Card, HandEvaluator
+from src.cfr_strategy import CFRAgent, create_info_set
+from src.equity import DEFAULT_SAMPLES, OMAHA_MAX_SAMPLES, calculate_equity, set_equity_tables
+from src.equity_tables import load_equity_tables
+from src.ranges import equity_vs_range
+from src.draws import analyze_draws
+from src.abstraction import load_bucket_maps, load_strength_tables, set_bucket_maps, set_strength_tables
 from src.blockchain_bridge import BlockchainBridge
+from src.seed_chain import SeedChainManager
+from src.fairness_audit import audit_hands, iter_hand_records
+from src.merkle import CommitmentBatcher
 
 load_dotenv()
 
@@ -18,12 +29,60 @@ app.config['SEND_FILE_MAX_AGE_DEFAULT'] = 0
 socketio = SocketIO(app, cors_allowed_origins="*", async_mode='eventlet')
 
 init_db()
+set_equity_tables(load_equity_tables())
+set_strength_tables(load_strength_tables())
+set_bucket_maps(load_bucket_maps())
+
+eval_cache_size = int(os.getenv('EVAL_CACHE_SIZE', '0'))
+if eval_cache_size > 0:
+    HandEvaluator.enable_cache(eval_cache_size)
 
 games = {}
 cfr_agent = CFRAgent(load_from_db=True)
 blockchain = BlockchainBridge()
 
 
+def _publish_seed_chain(chain):
+    print(f"New seed chain {chain.chain_id} with terminal {chain.terminal}")
+    if blockchain.is_connected():
+        blockchain.publish_seed_chain(chain.chain_id, chain.terminal)
+
+
+seed_chains = SeedChainManager(int(os.getenv('SEED_CHAIN_LENGTH', '1000')), _publish_seed_chain)
+
+
+def _anchor_merkle_batch(batch_id, root, proofs):
+    if blockchain.is_connected():
+        blockchain.anchor_merkle_root(batch_id, root)
+    
+    db_session = get_db_session()
+    try:
+        # Proofs are kept by commitment so hands saved after the batcher has
+        # dropped this batch can still pick theirs up.
+        for commitment, proof in proofs.items():
+            db_session.merge(MerkleProof(commitment=commitment, batch_id=batch_id, root=root, proof=proof))
+            db_session.query(HandHistory).filter_by(commitment=commitment).update({
+                'merkle_batch': batch_id,
+                'merkle_root': root,
+                'merkle_proof': proof
+            })
+        db_session.commit()
+    finally:
+        db_session.close()
+
+
+commitment_batcher = CommitmentBatcher(float(os.getenv('MERKLE_WINDOW_SECONDS', '60')), _anchor_merkle_batch)
+
+
+def _merkle_flush_loop():
+    while True:
+        socketio.sleep(1)
+        commitment_batcher.flush_if_due()
+
+
+socketio.start_background_task(_merkle_flush_loop)
+
+
 @app.after_request
 def add_header(response):
     response.headers['Cache-Control'] = 'no-cache, no-store, must-revalidate'
@@ -45,6 +104,40 @@ def health():
     })
 
 
+@app.route('/api/stats')
+def stats():
+    return jsonify({
+        'active_games': len(games),
+        'evaluation_cache': HandEvaluator.cache_stats(),
+        'seed_chain': seed_chains.stats(),
+        'merkle_batches': commitment_batcher.stats()
+    })
+
+
+@app.route('/api/audit')
+def audit():
+    audit_token = os.getenv('AUDIT_TOKEN')
+    supplied = request.headers.get('Authorization', '').removeprefix('Bearer ')
+    if not audit_token or not hmac.compare_digest(supplied.encode(), audit_token.encode()):
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    since_id = request.args.get('since_id', 0, type=int)
+    limit = request.args.get('limit', None, type=int)
+    failures_only = request.args.get('failures_only', 'false').lower() == 'true'
+    max_workers = os.cpu_count() or 1
+    workers = min(max(1, request.args.get('workers', max_workers, type=int)), max_workers)
+    
+    def generate():
+        # Each step of the audit runs in a native thread so the eventlet hub keeps
+        # serving the tables while the process pool works.
+        findings = tpool.Proxy(audit_hands(iter_hand_records(since_id=since_id, limit=limit), workers))
+        for finding in findings:
+            if not failures_only or not finding['ok']:
+                yield json.dumps(finding) + '\n'
+    
+    return Response(generate(), mimetype='application/x-ndjson')
+
+
 @app.route('/api/train', methods=['POST'])
 def train_ai():
     data = request.json or {}
@@ -67,9 +160,13 @@ def handle_disconnect():
 @socketio.on('create_game')
 def handle_create_game(data):
     player_name = data.get('name', 'Player')
+    variant = data.get('variant', 'holdem')
+    if variant not in PokerGame.HOLE_CARDS:
+        emit('error', {'message': f'Unknown game variant: {variant}'})
+        return
     session_id = secrets.token_hex(16)
     
-    game = PokerGame(session_id)
+    game = PokerGame(session_id, variant, seed_chains.table_chain())
     game.add_player(request.sid, player_name, chips=1000)
     game.add_player('ai_player', 'AI Opponent', chips=1000)
     
@@ -78,17 +175,13 @@ def handle_create_game(data):
     join_room(session_id)
     
     commitment = game.request_commitment()
-    
-    if blockchain.is_connected():
-        try:
-            blockchain.commit_hand(session_id, commitment)
-        except Exception as e:
-            print(f"Blockchain commit failed: {e}")
+    commitment_batcher.add(commitment)
     
     emit('game_created', {
         'session_id': session_id,
         'message': f'Game created! Session: {session_id}',
-        'commitment': commitment
+        'commitment': commitment,
+        'variant': variant
     })
 
 
@@ -119,12 +212,7 @@ def handle_request_commitment(data):
     
     game = games[session_id]
     commitment = game.request_commitment()
-    
-    if blockchain.is_connected():
-        try:
-            blockchain.commit_hand(session_id, commitment)
-        except Exception as e:
-            print(f"Blockchain commit failed: {e}")
+    commitment_batcher.add(commitment)
     
     emit('commitment_ready', {
         'session_id': session_id,
@@ -148,15 +236,16 @@ def handle_start_hand(data):
         emit('error', {'message': 'Server must commit first. Request commitment.'})
         return
     
+    commitment = game.deck.commitment
     state = game.start_hand(client_seed)
+    if game.deck.commitment != commitment:
+        commitment_batcher.add(game.deck.commitment)
     
-    for player in game.players:
-        if player.id == request.sid:
-            player_state = state.copy()
-            player_state['your_cards'] = [c.to_dict() for c in player.hole_cards]
-            emit('hand_started', player_state)
-        elif player.id.startswith('ai_'):
-            pass
+    player = game.get_player(request.sid)
+    if player:
+        player_state = state.copy()
+        player_state['your_cards'] = [c.to_dict() for c in player.hole_cards]
+        emit('hand_started', player_state)
     
     emit('game_state', state, room=session_id)
 
@@ -179,11 +268,11 @@ def handle_bet_action(data):
         emit('error', result)
         return
     
-    for player in game.players:
-        if player.id == request.sid:
-            player_state = result.copy()
-            player_state['your_cards'] = [c.to_dict() for c in player.hole_cards]
-            emit('action_result', player_state)
+    player = game.get_player(request.sid)
+    if player:
+        player_state = result.copy()
+        player_state['your_cards'] = [c.to_dict() for c in player.hole_cards]
+        emit('action_result', player_state)
     
     emit('game_state', result, room=session_id)
     
@@ -216,7 +305,7 @@ def _process_ai_turn(session_id: str, game: PokerGame):
         print(f"[AI TURN] Not AI's turn, returning")
         return
     
-    print(f"[AI TURN] AI is taking action!")
+    print(f"[AI TURN] AI is taking action with {game.made_hand(ai_player)}!")
     
     info_set = create_info_set(
         ai_player.hole_cards,
@@ -282,16 +371,15 @@ def handle_gto_advice(data):
     
     game = games[session_id]
     
-    player = None
-    for p in game.players:
-        if p.id == request.sid:
-            player = p
-            break
-    
+    player = game.get_player(request.sid)
     if not player:
         emit('error', {'message': 'Player not found'})
         return
     
+    if len(player.hole_cards) != PokerGame.HOLE_CARDS[game.variant]:
+        emit('error', {'message': 'No hand in progress'})
+        return
+    
     info_set = create_info_set(
         player.hole_cards,
         game.community_cards,
@@ -300,19 +388,30 @@ def handle_gto_advice(data):
         game.stage
     )
     
-    hand_equity = estimate_hand_equity(
-        player.hole_cards,
-        game.community_cards,
-        game.stage
-    )
+    num_opponents = max(1, game.active_count - (0 if player.is_folded else 1))
+    if num_opponents == 1 and game.variant == 'holdem':
+        equity_result = equity_vs_range(player.hole_cards, game.community_cards)
+    else:
+        equity_result = calculate_equity(
+            player.hole_cards,
+            game.community_cards,
+            num_opponents,
+            OMAHA_MAX_SAMPLES if game.variant == 'omaha' else DEFAULT_SAMPLES
+        )
+    
+    draws = analyze_draws(player.hole_cards, game.community_cards) if game.variant == 'holdem' else None
     
     ev_analysis = cfr_agent.calculate_ev(
         info_set,
         game.pot,
         game.current_bet - player.current_bet,
         player.chips,
-        hand_equity
+        equity_result.equity,
+        draws.to_dict() if draws else None
     )
+    ev_analysis['equity_ci'] = [equity_result.ci_low, equity_result.ci_high]
+    ev_analysis['equity_method'] = equity_result.method
+    ev_analysis['made_hand'] = game.made_hand(player)
     
     emit('gto_advice', ev_analysis)
 
@@ -331,9 +430,21 @@ def _save_hand_history(game: PokerGame, winner_result: dict):
             pot_won=winner_result['pot'],
             hand_rank=winner_result['hand_rank'],
             server_seed=game.deck.server_seed,
-            client_seed=game.deck.client_seed
+            client_seed=game.deck.client_seed,
+            commitment=game.deck.commitment,
+            shuffle_version=game.deck.shuffle_version
         )
         
+        inclusion = commitment_batcher.proof_for(game.deck.commitment)
+        if inclusion is None:
+            stored = db_session.get(MerkleProof, game.deck.commitment)
+            if stored:
+                inclusion = {'batch_id': stored.batch_id, 'root': stored.root, 'proof': stored.proof}
+        if inclusion:
+            history.merkle_batch = inclusion['batch_id']
+            history.merkle_root = inclusion['root']
+            history.merkle_proof = inclusion['proof']
+        
         db_session.add(history)
         db_session.commit()
         db_session.close()
@@ -341,7 +452,7 @@ def _save_hand_history(game: PokerGame, winner_result: dict):
         if blockchain.is_connected():
             try:
                 winner_id = winner_result['winner']['id']
-                winner_player = next((p for p in game.players if p.id == winner_id), None)
+                winner_player = game.get_player(winner_id)
                 winner_address = winner_player.wallet_address if winner_player and winner_player.wallet_address else None
                 
                 if winner_address and winner_address.startswith('0x') and len(winner_address) == 42:
@@ -0,0 +1,412 @@
+import argparse
+import os
+import struct
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+from math import comb
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.cards import card_ids
+from src.equity import remaining_cards
+from src.isomorphism import get_indexer, hand_from_index, hand_index, street_rounds
+from src.poker_engine import HandEvaluator
+
+
+STREET_BOARD_CARDS = {'preflop': 0, 'flop': 3, 'turn': 4, 'river': 5}
+
+TABLE_MAGIC = b'CBHSTBL1'
+TABLE_VERSION = 1
+HEADER_FORMAT = '<8sIIQI'
+HEADER_SIZE = 64
+NUM_BINS = 20
+DEFAULT_RUNOUTS = 100
+
+BUCKET_MAGIC = b'CBBKTMAP'
+BUCKET_VERSION = 1
+DEFAULT_BUCKETS = 100
+KMEANS_ITERATIONS = 50
+KMEANS_CHUNK = 4096
+KMEANS_FIT_SIZE = 500000
+
+DEFAULT_TABLES_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data')
+
+_strength_tables: Dict[str, 'HandStrengthTable'] = {}
+_bucket_maps: Dict[str, 'BucketMap'] = {}
+
+
+def _align(offset: int, alignment: int = 8) -> int:
+    return (offset + alignment - 1) // alignment * alignment
+
+
+def table_path(street: str, directory: Optional[str] = None) -> str:
+    return os.path.join(directory or DEFAULT_TABLES_DIR, f'hand_strength_{street}.bin')
+
+
+def bucket_path(street: str, directory: Optional[str] = None) -> str:
+    return os.path.join(directory or DEFAULT_TABLES_DIR, f'buckets_{street}.bin')
+
+
+def river_hand_strengths(hole: Sequence[int], board: Sequence[int],
+                         max_runouts: int = DEFAULT_RUNOUTS,
+                         rng: Optional[np.random.Generator] = None) -> np.ndarray:
+    hole, board = list(hole), list(board)
+    remaining = remaining_cards(hole + board)
+    board_needed = 5 - len(board)
+
+    if comb(len(remaining), board_needed) <= max_runouts:
+        runout_list = list(combinations(remaining.tolist(), board_needed))
+        runouts = np.array(runout_list, dtype=np.int64).reshape(len(runout_list), board_needed)
+    else:
+        rng = rng or np.random.default_rng()
+        runouts = rng.permuted(np.broadcast_to(remaining, (max_runouts, len(remaining))), axis=1)
+        runouts = runouts[:, :board_needed]
+
+    num_runouts = len(runouts)
+    full_boards = np.concatenate(
+        [np.broadcast_to(np.array(board, dtype=np.int64), (num_runouts, len(board))), runouts], axis=1
+    )
+    hero = HandEvaluator.evaluate_batch(
+        np.concatenate([np.broadcast_to(np.array(hole, dtype=np.int64), (num_runouts, 2)), full_boards], axis=1)
+    )
+
+    pairs = np.array(list(combinations(remaining.tolist(), 2)), dtype=np.int64)
+    valid = ~(runouts[:, None, :, None] == pairs[None, :, None, :]).any(axis=(2, 3))
+
+    rows = valid.ravel()
+    opponents = np.full(valid.shape, -1, dtype=np.int64)
+    opponents.ravel()[rows] = HandEvaluator.evaluate_batch(np.concatenate(
+        [np.tile(pairs, (num_runouts, 1))[rows], np.repeat(full_boards, len(pairs), axis=0)[rows]], axis=1
+    ))
+
+    shares = np.where(hero[:, None] > opponents, 1.0, np.where(hero[:, None] == opponents, 0.5, 0.0))
+    return (shares * valid).sum(axis=1) / valid.sum(axis=1)
+
+
+def strength_features(hole: Sequence[int], board: Sequence[int],
+                      max_runouts: int = DEFAULT_RUNOUTS,
+                      rng: Optional[np.random.Generator] = None) -> Tuple[float, float, np.ndarray]:
+    strengths = river_hand_strengths(hole, board, max_runouts, rng)
+    counts, _ = np.histogram(strengths, bins=NUM_BINS, range=(0.0, 1.0))
+    return float(strengths.mean()), float(np.square(strengths).mean()), counts / len(strengths)
+
+
+class HandStrengthTable:
+    def __init__(self, street: str, ehs: np.ndarray, ehs2: np.ndarray, histograms: np.ndarray):
+        self.street = street
+        self.ehs = ehs
+        self.ehs2 = ehs2
+        self.histograms = histograms
+
+    @classmethod
+    def load(cls, path: str) -> 'HandStrengthTable':
+        with open(path, 'rb') as f:
+            magic, version, board_cards, num_classes, num_bins = struct.unpack(
+                HEADER_FORMAT, f.read(struct.calcsize(HEADER_FORMAT))
+            )
+        if magic != TABLE_MAGIC or version != TABLE_VERSION:
+            raise ValueError(f"Unsupported hand strength table file: {path}")
+        street = next(s for s, n in STREET_BOARD_CARDS.items() if n == board_cards)
+        if num_classes != get_indexer(street_rounds(board_cards)).size:
+            raise ValueError(f"Hand strength table does not match the hand index: {path}")
+
+        ehs2_offset = _align(HEADER_SIZE + num_classes * 2)
+        hist_offset = _align(ehs2_offset + num_classes * 2)
+        ehs = np.memmap(path, dtype=np.float16, mode='r', offset=HEADER_SIZE, shape=(num_classes,))
+        ehs2 = np.memmap(path, dtype=np.float16, mode='r', offset=ehs2_offset, shape=(num_classes,))
+        histograms = np.memmap(path, dtype=np.uint8, mode='r', offset=hist_offset, shape=(num_classes, num_bins))
+        return cls(street, ehs, ehs2, histograms)
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        num_classes, num_bins = self.histograms.shape
+        header = struct.pack(HEADER_FORMAT, TABLE_MAGIC, TABLE_VERSION,
+                             STREET_BOARD_CARDS[self.street], num_classes, num_bins)
+        ehs2_offset = _align(HEADER_SIZE + num_classes * 2)
+        hist_offset = _align(ehs2_offset + num_classes * 2)
+        with open(path, 'wb') as f:
+            f.write(header.ljust(HEADER_SIZE, b'\0'))
+            f.write(np.ascontiguousarray(self.ehs, dtype=np.float16).tobytes())
+            f.write(b'\0' * (ehs2_offset - HEADER_SIZE - num_classes * 2))
+            f.write(np.ascontiguousarray(self.ehs2, dtype=np.float16).tobytes())
+            f.write(b'\0' * (hist_offset - ehs2_offset - num_classes * 2))
+            f.write(np.ascontiguousarray(self.histograms, dtype=np.uint8).tobytes())
+
+    def histogram(self, index: int) -> np.ndarray:
+        counts = self.histograms[index].astype(np.float64)
+        return counts / counts.sum()
+
+
+def load_strength_tables(directory: Optional[str] = None) -> Dict[str, HandStrengthTable]:
+    directory = directory or os.getenv('HAND_STRENGTH_TABLES_DIR', DEFAULT_TABLES_DIR)
+    tables = {}
+    for street in STREET_BOARD_CARDS:
+        path = table_path(street, directory)
+        if not os.path.exists(path):
+            continue
+        try:
+            tables[street] = HandStrengthTable.load(path)
+        except Exception as e:
+            print(f"Could not load hand strength table for {street}: {e}")
+    return tables
+
+
+def set_strength_tables(tables: Dict[str, HandStrengthTable]) -> None:
+    global _strength_tables
+    _strength_tables = tables
+
+
+def lookup_strength(hole_cards: Sequence, community_cards: Sequence = ()) -> Optional[Tuple[float, float]]:
+    hole, board = card_ids(hole_cards), card_ids(community_cards)
+    street = next((s for s, n in STREET_BOARD_CARDS.items() if n == len(board)), None)
+    table = _strength_tables.get(street)
+    if table is None or len(hole) != 2:
+        return None
+    index = hand_index(hole, board)
+    return float(table.ehs[index]), float(table.ehs2[index])
+
+
+class BucketMap:
+    def __init__(self, street: str, buckets: np.ndarray, bucket_equity: np.ndarray):
+        self.street = street
+        self.buckets = buckets
+        self.bucket_equity = bucket_equity
+        # Buckets are ordered by mean equity, so a raw strength maps to a bucket
+        # through the midpoints between neighbouring bucket means.
+        self.edges = (bucket_equity[1:] + bucket_equity[:-1]) / 2
+
+    @property
+    def num_buckets(self) -> int:
+        return len(self.bucket_equity)
+
+    @classmethod
+    def load(cls, path: str) -> 'BucketMap':
+        with open(path, 'rb') as f:
+            magic, version, board_cards, num_classes, num_buckets = struct.unpack(
+                HEADER_FORMAT, f.read(struct.calcsize(HEADER_FORMAT))
+            )
+        if magic != BUCKET_MAGIC or version != BUCKET_VERSION:
+            raise ValueError(f"Unsupported bucket map file: {path}")
+        street = next(s for s, n in STREET_BOARD_CARDS.items() if n == board_cards)
+        if num_classes != get_indexer(street_rounds(board_cards)).size:
+            raise ValueError(f"Bucket map does not match the hand index: {path}")
+
+        dtype = np.uint8 if num_buckets <= 256 else np.uint16
+        bucket_equity = np.fromfile(path, dtype=np.float32, count=num_buckets, offset=HEADER_SIZE)
+        buckets_offset = _align(HEADER_SIZE + num_buckets * 4)
+        buckets = np.memmap(path, dtype=dtype, mode='r', offset=buckets_offset, shape=(num_classes,))
+        return cls(street, buckets, bucket_equity)
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        dtype = np.uint8 if self.num_buckets <= 256 else np.uint16
+        header = struct.pack(HEADER_FORMAT, BUCKET_MAGIC, BUCKET_VERSION,
+                             STREET_BOARD_CARDS[self.street], len(self.buckets), self.num_buckets)
+        buckets_offset = _align(HEADER_SIZE + self.num_buckets * 4)
+        with open(path, 'wb') as f:
+            f.write(header.ljust(HEADER_SIZE, b'\0'))
+            f.write(np.ascontiguousarray(self.bucket_equity, dtype=np.float32).tobytes())
+            f.write(b'\0' * (buckets_offset - HEADER_SIZE - self.num_buckets * 4))
+            f.write(np.ascontiguousarray(self.buckets, dtype=dtype).tobytes())
+
+    def strength_bucket(self, strength: float) -> int:
+        return int(np.searchsorted(self.edges, strength, side='right'))
+
+
+def _histogram_cdfs(histograms: np.ndarray) -> np.ndarray:
+    counts = np.asarray(histograms, dtype=np.float32)
+    return np.cumsum(counts / counts.sum(axis=1, keepdims=True), axis=1)
+
+
+def _emd_distances(histograms: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    # For histograms over equal-width bins, earth mover's distance is the L1
+    # distance between CDFs (up to the bin width).
+    cdfs = _histogram_cdfs(histograms)
+    return np.abs(cdfs[:, None, :] - centroids[None, :, :]).sum(axis=2)
+
+
+def _emd_assign(cdfs: np.ndarray, centroids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    labels = np.empty(len(cdfs), dtype=np.int64)
+    distances = np.empty(len(cdfs), dtype=np.float32)
+    for start in range(0, len(cdfs), KMEANS_CHUNK):
+        chunk = cdfs[start:start + KMEANS_CHUNK]
+        d = np.abs(chunk[:, None, :] - centroids[None, :, :]).sum(axis=2)
+        labels[start:start + KMEANS_CHUNK] = d.argmin(axis=1)
+        distances[start:start + KMEANS_CHUNK] = d.min(axis=1)
+    return labels, distances
+
+
+def emd_labels(histograms: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    # Streams the (possibly memory-mapped) histograms so only one chunk of CDFs
+    # exists at a time; labels use the smallest dtype that fits.
+    dtype = np.uint8 if len(centroids) <= 256 else np.uint16
+    labels = np.empty(len(histograms), dtype=dtype)
+    for start in range(0, len(histograms), KMEANS_CHUNK):
+        d = _emd_distances(histograms[start:start + KMEANS_CHUNK], centroids)
+        labels[start:start + KMEANS_CHUNK] = d.argmin(axis=1)
+    return labels
+
+
+def kmeans_emd(histograms: np.ndarray, k: int, iterations: int = KMEANS_ITERATIONS,
+               rng: Optional[np.random.Generator] = None,
+               sample_size: int = 100000,
+               fit_size: int = KMEANS_FIT_SIZE) -> Tuple[np.ndarray, np.ndarray]:
+    rng = rng or np.random.default_rng()
+    k = min(k, len(histograms))
+
+    # Centroids are fitted on at most fit_size classes held as float32 CDFs;
+    # every class of the street is then assigned chunk by chunk.
+    if len(histograms) > fit_size:
+        fit = np.sort(rng.choice(len(histograms), fit_size, replace=False))
+        cdfs = np.concatenate([_histogram_cdfs(histograms[fit[i:i + KMEANS_CHUNK]])
+                               for i in range(0, fit_size, KMEANS_CHUNK)])
+    else:
+        cdfs = _histogram_cdfs(histograms)
+
+    # k-means++ seeding on a sample keeps initialisation cheap on the large streets.
+    sample = cdfs[rng.choice(len(cdfs), min(sample_size, len(cdfs)), replace=False)]
+    centroids = [sample[rng.integers(len(sample))]]
+    nearest = np.abs(sample - centroids[0]).sum(axis=1, dtype=np.float64)
+    for _ in range(1, k):
+        total = nearest.sum()
+        pick = rng.choice(len(sample), p=nearest / total) if total > 0 else rng.integers(len(sample))
+        centroids.append(sample[pick])
+        nearest = np.minimum(nearest, np.abs(sample - sample[pick]).sum(axis=1, dtype=np.float64))
+    centroids = np.array(centroids, dtype=np.float32)
+
+    labels = None
+    for _ in range(iterations):
+        new_labels, distances = _emd_assign(cdfs, centroids)
+        if labels is not None and np.array_equal(labels, new_labels):
+            break
+        labels = new_labels
+        counts = np.bincount(labels, minlength=k)
+        sums = np.zeros(centroids.shape)
+        np.add.at(sums, labels, cdfs)
+        empty = counts == 0
+        centroids[~empty] = sums[~empty] / counts[~empty, None]
+        # Reseed empty clusters on the points furthest from their centroid.
+        if empty.any():
+            centroids[empty] = cdfs[np.argsort(distances)[-empty.sum():]]
+
+    return emd_labels(histograms, centroids), centroids
+
+
+def build_bucket_map(table: HandStrengthTable, num_buckets: int = DEFAULT_BUCKETS,
+                     iterations: int = KMEANS_ITERATIONS, seed: int = 0) -> BucketMap:
+    labels, centroids = kmeans_emd(table.histograms, num_buckets, iterations, np.random.default_rng(seed))
+    k = len(centroids)
+    sums = np.zeros(k)
+    counts = np.zeros(k, dtype=np.int64)
+    for start in range(0, len(labels), KMEANS_CHUNK):
+        chunk = labels[start:start + KMEANS_CHUNK]
+        sums += np.bincount(chunk, weights=table.ehs[start:start + KMEANS_CHUNK].astype(np.float64), minlength=k)
+        counts += np.bincount(chunk, minlength=k)
+    # A cluster left empty by the full-street assignment gets its centroid's mean.
+    centroid_equity = (NUM_BINS - centroids.sum(axis=1) + 0.5) / NUM_BINS
+    cluster_equity = np.where(counts > 0, sums / np.maximum(counts, 1), centroid_equity)
+
+    order = np.argsort(cluster_equity, kind='stable')
+    rank = np.empty(k, dtype=labels.dtype)
+    rank[order] = np.arange(k)
+    return BucketMap(table.street, rank[labels], cluster_equity[order].astype(np.float32))
+
+
+def load_bucket_maps(directory: Optional[str] = None) -> Dict[str, BucketMap]:
+    directory = directory or os.getenv('HAND_STRENGTH_TABLES_DIR', DEFAULT_TABLES_DIR)
+    maps = {}
+    for street in STREET_BOARD_CARDS:
+        path = bucket_path(street, directory)
+        if not os.path.exists(path):
+            continue
+        try:
+            maps[street] = BucketMap.load(path)
+        except Exception as e:
+            print(f"Could not load bucket map for {street}: {e}")
+    return maps
+
+
+def set_bucket_maps(maps: Dict[str, BucketMap]) -> None:
+    global _bucket_maps
+    _bucket_maps = maps
+
+
+def lookup_bucket(hole_cards: Sequence, community_cards: Sequence = ()) -> Optional[int]:
+    hole, board = card_ids(hole_cards), card_ids(community_cards)
+    street = next((s for s, n in STREET_BOARD_CARDS.items() if n == len(board)), None)
+    bucket_map = _bucket_maps.get(street)
+    if bucket_map is None or len(hole) != 2:
+        return None
+    return int(bucket_map.buckets[hand_index(hole, board)])
+
+
+def strength_bucket(strength: float, street: str) -> Optional[int]:
+    bucket_map = _bucket_maps.get(street)
+    if bucket_map is None:
+        return None
+    return bucket_map.strength_bucket(strength)
+
+
+def _build_chunk(args) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    start, stop, board_cards, max_runouts, seed = args
+    ehs = np.empty(stop - start, dtype=np.float16)
+    ehs2 = np.empty(stop - start, dtype=np.float16)
+    histograms = np.empty((stop - start, NUM_BINS), dtype=np.uint8)
+    for i, index in enumerate(range(start, stop)):
+        hole, board = hand_from_index(index, board_cards)
+        rng = np.random.default_rng([seed, board_cards, index])
+        ehs[i], ehs2[i], hist = strength_features(hole, board, max_runouts, rng)
+        histograms[i] = np.round(hist * 255)
+    return ehs, ehs2, histograms
+
+
+def build_table(street: str, max_runouts: int = DEFAULT_RUNOUTS, seed: int = 0,
+                workers: Optional[int] = None, chunk_size: int = 500) -> HandStrengthTable:
+    board_cards = STREET_BOARD_CARDS[street]
+    num_classes = get_indexer(street_rounds(board_cards)).size
+    ehs = np.empty(num_classes, dtype=np.float16)
+    ehs2 = np.empty(num_classes, dtype=np.float16)
+    histograms = np.empty((num_classes, NUM_BINS), dtype=np.uint8)
+
+    chunks = [(i, min(i + chunk_size, num_classes), board_cards, max_runouts, seed)
+              for i in range(0, num_classes, chunk_size)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for done, ((start, stop, *_), result) in enumerate(zip(chunks, pool.map(_build_chunk, chunks)), 1):
+            ehs[start:stop], ehs2[start:stop], histograms[start:stop] = result
+            if done % 100 == 0:
+                print(f"Completed {done}/{len(chunks)} {street} chunks")
+
+    return HandStrengthTable(street, ehs, ehs2, histograms)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build hand strength tables and k-means bucket maps per street')
+    parser.add_argument('streets', nargs='+', choices=list(STREET_BOARD_CARDS))
+    parser.add_argument('--output-dir', default=DEFAULT_TABLES_DIR)
+    parser.add_argument('--runouts', type=int, default=DEFAULT_RUNOUTS)
+    parser.add_argument('--buckets', type=int, default=None,
+                        help='Cluster the street\'s histograms into this many buckets')
+    parser.add_argument('--iterations', type=int, default=KMEANS_ITERATIONS)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    for street in args.streets:
+        path = table_path(street, args.output_dir)
+        if args.buckets and os.path.exists(path):
+            table = HandStrengthTable.load(path)
+        else:
+            table = build_table(street, args.runouts, args.seed, args.workers)
+            table.save(path)
+            print(f"Wrote {street} hand strength table to {path}")
+
+        if args.buckets:
+            bucket_map = build_bucket_map(table, args.buckets, args.iterations, args.seed)
+            path = bucket_path(street, args.output_dir)
+            bucket_map.save(path)
+            print(f"Wrote {street} bucket map ({bucket_map.num_buckets} buckets) to {path}")
+
+
+if __name__ == '__main__':
+    main()
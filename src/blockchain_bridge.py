@@ -200,6 +200,12 @@ class BlockchainBridge:
             print(f"Commit hand error: {e}")
             return None
     
+    def publish_seed_chain(self, chain_id: str, terminal: str) -> Optional[str]:
+        return self.commit_hand(f"seed-chain:{chain_id}", terminal)
+    
+    def anchor_merkle_root(self, batch_id: str, root: str) -> Optional[str]:
+        return self.commit_hand(f"merkle:{batch_id}", root)
+    
     def reveal_and_payout(self, game_id: str, winner_address: str,
                           server_seed: str, client_seed: str) -> Optional[str]:
         if not self.is_connected() or not self.contract:
@@ -0,0 +1,93 @@
+from typing import Dict, Iterable, List, Tuple
+
+
+RANKS = ['2', '3', '4', '5', '6', '7', '8', '9', 'T', 'J', 'Q', 'K', 'A']
+SUITS = ['h', 'd', 'c', 's']
+RANK_VALUES = {r: i for i, r in enumerate(RANKS, 2)}
+
+NUM_CARDS = 52
+FULL_DECK_MASK = (1 << NUM_CARDS) - 1
+
+# Card ids are rank_index * 4 + suit_index, so id order matches the unshuffled deck order.
+CARD_RANKS = [i >> 2 for i in range(NUM_CARDS)]
+CARD_SUITS = [i & 3 for i in range(NUM_CARDS)]
+CARD_RANK_BITS = [1 << (i >> 2) for i in range(NUM_CARDS)]
+
+
+class Card:
+    __slots__ = ('rank', 'suit', 'id', 'mask')
+
+    def __new__(cls, rank: str, suit: str):
+        try:
+            return _CARDS_BY_NAME[(rank, suit)]
+        except KeyError:
+            raise ValueError(f"Invalid card: {rank}{suit}")
+
+    @classmethod
+    def _intern(cls, card_id: int) -> 'Card':
+        card = object.__new__(cls)
+        card.rank = RANKS[card_id >> 2]
+        card.suit = SUITS[card_id & 3]
+        card.id = card_id
+        card.mask = 1 << card_id
+        return card
+
+    def __str__(self):
+        return f"{self.rank}{self.suit}"
+
+    def __repr__(self):
+        return str(self)
+
+    def __reduce__(self):
+        return (Card.from_id, (self.id,))
+
+    def to_dict(self):
+        return {'rank': self.rank, 'suit': self.suit}
+
+    @staticmethod
+    def from_dict(d):
+        return Card(d['rank'], d['suit'])
+
+    @staticmethod
+    def from_id(card_id: int) -> 'Card':
+        return CARDS[card_id]
+
+    @staticmethod
+    def from_str(s: str) -> 'Card':
+        return Card(s[0].upper(), s[1].lower())
+
+
+CARDS: Tuple[Card, ...] = tuple(Card._intern(i) for i in range(NUM_CARDS))
+_CARDS_BY_NAME: Dict[Tuple[str, str], Card] = {(c.rank, c.suit): c for c in CARDS}
+
+
+def card_id(rank: str, suit: str) -> int:
+    return RANKS.index(rank) * 4 + SUITS.index(suit)
+
+
+def card_ids(cards: Iterable) -> List[int]:
+    return [c if isinstance(c, int) else _to_card(c).id for c in cards]
+
+
+def cards_to_mask(ids: Iterable[int]) -> int:
+    mask = 0
+    for i in ids:
+        mask |= 1 << i
+    return mask
+
+
+def mask_to_ids(mask: int) -> List[int]:
+    ids = []
+    while mask:
+        low = mask & -mask
+        ids.append(low.bit_length() - 1)
+        mask ^= low
+    return ids
+
+
+def _to_card(c) -> Card:
+    if isinstance(c, Card):
+        return c
+    if isinstance(c, dict):
+        return Card.from_dict(c)
+    return Card.from_str(c)
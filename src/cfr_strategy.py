@@ -3,6 +3,8 @@ from typing import Dict, List, Tuple, Optional
 from dataclasses import dataclass
 import json
 from src.models import get_session, RegretTable
+from src.equity import DEFAULT_SAMPLES, OMAHA_MAX_SAMPLES, calculate_equity
+from src.abstraction import lookup_bucket, lookup_strength, strength_bucket
 
 
 @dataclass
@@ -140,10 +142,11 @@ class CFRAgent:
     
     def calculate_ev(self, info_set: str, pot_size: float, 
                     current_bet: float, player_chips: float,
-                    hand_strength: float = 0.5) -> Dict:
+                    hand_strength: float = 0.5, draws: Optional[Dict] = None) -> Dict:
         strategy = self.get_average_strategy(info_set)
         
         equity = hand_strength
+        semi_bluff = draws is not None and (draws['flush_draw'] or draws['open_ended'])
         
         fold_ev = 0.0
         check_call_ev = pot_size * equity - current_bet * (1 - equity)
@@ -151,10 +154,15 @@ class CFRAgent:
         raise_pot_ev = (pot_size * 2) * (equity * 1.2) - (current_bet + pot_size) * (1 - equity * 1.1)
         all_in_ev = (pot_size + player_chips * 2) * (equity * 1.3) - player_chips * (1 - equity)
         
-        if equity < 0.3:
+        if equity < 0.3 and not semi_bluff:
             raise_half_ev *= 0.3
             raise_pot_ev *= 0.2
             all_in_ev *= 0.1
+        elif equity < 0.3:
+            # Strong draws keep some fold equity on raises but should not shove.
+            raise_half_ev *= 0.8
+            raise_pot_ev *= 0.6
+            all_in_ev *= 0.2
         
         action_evs = {
             'fold': fold_ev,
@@ -170,7 +178,7 @@ class CFRAgent:
         
         best_action = max(action_evs, key=action_evs.get)
         
-        return {
+        result = {
             'action_evs': action_evs,
             'strategy': {self.ACTIONS[i]: float(strategy[i]) for i in range(self.NUM_ACTIONS)},
             'weighted_ev': float(weighted_ev),
@@ -178,6 +186,10 @@ class CFRAgent:
             'confidence': float(max(strategy)),
             'equity': equity
         }
+        if draws is not None:
+            result['draws'] = draws
+            result['pot_odds'] = current_bet / (pot_size + current_bet) if current_bet > 0 else 0.0
+        return result
     
     def train(self, iterations: int = 1000):
         print(f"Training CFR Agent for {iterations} iterations...")
@@ -224,7 +236,7 @@ class CFRAgent:
             return pot * 0.5 * winner
         
         strength = p1_strength if player_to_act == 0 else p2_strength
-        strength_cat = self._categorize_strength(strength)
+        strength_cat = self._categorize_strength(strength, stage)
         info_set = f"{strength_cat}|{stage}|{betting_history}|{int(pot)}"
         
         strategy = self.get_strategy(info_set)
@@ -279,18 +291,34 @@ class CFRAgent:
         
         return counterfactual_value
     
-    def _categorize_strength(self, strength: float) -> str:
-        if strength < 0.25:
-            return 'weak'
-        elif strength < 0.5:
-            return 'medium'
-        elif strength < 0.75:
-            return 'strong'
-        else:
-            return 'premium'
+    def _categorize_strength(self, strength: float, stage: str = 'preflop') -> str:
+        bucket = strength_bucket(strength, stage)
+        if bucket is not None:
+            return f"b{bucket}"
+        return categorize_strength(strength)
+
+
+def categorize_strength(strength: float) -> str:
+    if strength < 0.25:
+        return 'weak'
+    elif strength < 0.5:
+        return 'medium'
+    elif strength < 0.75:
+        return 'strong'
+    else:
+        return 'premium'
 
 
 def get_hand_strength_category(hole_cards: List, community_cards: List) -> str:
+    bucket = lookup_bucket(hole_cards, community_cards)
+    if bucket is not None:
+        return f"b{bucket}"
+    
+    features = lookup_strength(hole_cards, community_cards)
+    if features is not None:
+        # sqrt(E[HS^2]) stays on the equity scale but rewards drawing potential.
+        return categorize_strength(np.sqrt(features[1]))
+    
     total_cards = len(hole_cards) + len(community_cards)
     
     if total_cards < 4:
@@ -304,37 +332,13 @@ def get_hand_strength_category(hole_cards: List, community_cards: List) -> str:
             return 'medium'
         return 'weak'
     
-    return 'medium'
+    return categorize_strength(estimate_hand_equity(hole_cards, community_cards, 'postflop'))
 
 
-def estimate_hand_equity(hole_cards: List, community_cards: List, stage: str) -> float:
-    high_ranks = ['A', 'K', 'Q', 'J', 'T']
-    ranks = [c.rank if hasattr(c, 'rank') else c.get('rank', '2') for c in hole_cards]
-    
-    base_equity = 0.3
-    
-    for rank in ranks:
-        if rank == 'A':
-            base_equity += 0.15
-        elif rank == 'K':
-            base_equity += 0.12
-        elif rank == 'Q':
-            base_equity += 0.10
-        elif rank == 'J':
-            base_equity += 0.08
-        elif rank == 'T':
-            base_equity += 0.06
-        else:
-            base_equity += 0.02
-    
-    if len(set(ranks)) == 1:
-        base_equity += 0.15
-    
-    suits = [c.suit if hasattr(c, 'suit') else c.get('suit', 'x') for c in hole_cards]
-    if len(set(suits)) == 1:
-        base_equity += 0.05
-    
-    return min(0.95, max(0.05, base_equity))
+def estimate_hand_equity(hole_cards: List, community_cards: List, stage: str,
+                         num_opponents: int = 1) -> float:
+    samples = OMAHA_MAX_SAMPLES if len(hole_cards) == 4 else DEFAULT_SAMPLES
+    return calculate_equity(hole_cards, community_cards, num_opponents, samples).equity
 
 
 def create_info_set(hole_cards: List, community_cards: List, 
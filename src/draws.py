@@ -0,0 +1,110 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Sequence
+
+from src.cards import CARDS, NUM_CARDS, card_ids
+from src.hand_tables import NUM_RANKS, STRAIGHT_WINDOWS
+
+
+RANK_CARD_MASKS = [sum(1 << (r * 4 + s) for s in range(4)) for r in range(NUM_RANKS)]
+SUIT_CARD_MASKS = [sum(1 << (r * 4 + s) for r in range(NUM_RANKS)) for s in range(4)]
+
+
+def _completing_ranks(rank_mask: int) -> int:
+    completing = 0
+    for _, window in STRAIGHT_WINDOWS:
+        missing = window & ~rank_mask
+        if missing and missing & (missing - 1) == 0:
+            completing |= missing
+    return completing
+
+
+def _has_straight(rank_mask: int) -> bool:
+    return any(rank_mask & window == window for _, window in STRAIGHT_WINDOWS)
+
+
+# Indexed by a 13-bit rank mask: the ranks that would complete a straight it
+# does not already contain.
+STRAIGHT_COMPLETIONS = [0 if _has_straight(m) else _completing_ranks(m) for m in range(1 << NUM_RANKS)]
+
+
+@dataclass
+class DrawInfo:
+    flush_draw: bool = False
+    backdoor_flush_draw: bool = False
+    open_ended: bool = False
+    gutshot: bool = False
+    cards_to_come: int = 0
+    out_cards: List[int] = field(default_factory=list)
+
+    @property
+    def outs(self) -> int:
+        return len(self.out_cards)
+
+    @property
+    def draw_equity(self) -> float:
+        # Exact chance of hitting at least one out over the remaining streets.
+        unseen = NUM_CARDS - 7 + self.cards_to_come
+        miss = 1.0
+        for i in range(self.cards_to_come):
+            miss *= (unseen - i - self.outs) / (unseen - i)
+        return 1.0 - miss if self.outs else 0.0
+
+    def to_dict(self) -> Dict:
+        return {
+            'flush_draw': self.flush_draw,
+            'backdoor_flush_draw': self.backdoor_flush_draw,
+            'open_ended': self.open_ended,
+            'gutshot': self.gutshot,
+            'outs': self.outs,
+            'out_cards': [str(CARDS[c]) for c in self.out_cards],
+            'draw_equity': self.draw_equity
+        }
+
+
+def analyze_draws(hole_cards: Sequence, community_cards: Sequence) -> DrawInfo:
+    hole, board = card_ids(hole_cards), card_ids(community_cards)
+    cards_to_come = 5 - len(board)
+    if len(board) < 3 or cards_to_come <= 0:
+        return DrawInfo(cards_to_come=max(cards_to_come, 0))
+
+    dead = 0
+    hole_ranks = board_ranks = 0
+    suit_counts = [0] * 4
+    hole_suits = 0
+    for c in hole:
+        dead |= 1 << c
+        hole_ranks |= 1 << (c >> 2)
+        suit_counts[c & 3] += 1
+        hole_suits |= 1 << (c & 3)
+    for c in board:
+        dead |= 1 << c
+        board_ranks |= 1 << (c >> 2)
+        suit_counts[c & 3] += 1
+
+    info = DrawInfo(cards_to_come=cards_to_come)
+    out_mask = 0
+
+    # Draws only count when a hole card takes part in them.
+    if max(suit_counts) < 5:
+        for suit, count in enumerate(suit_counts):
+            if not hole_suits >> suit & 1:
+                continue
+            if count == 4:
+                info.flush_draw = True
+                out_mask |= SUIT_CARD_MASKS[suit]
+            elif count == 3 and cards_to_come == 2:
+                info.backdoor_flush_draw = True
+
+    completing = STRAIGHT_COMPLETIONS[hole_ranks | board_ranks] & ~STRAIGHT_COMPLETIONS[board_ranks]
+    num_completing = bin(completing).count('1')
+    if num_completing >= 2:
+        info.open_ended = True
+    elif num_completing == 1:
+        info.gutshot = True
+    for r in range(NUM_RANKS):
+        if completing >> r & 1:
+            out_mask |= RANK_CARD_MASKS[r]
+
+    out_mask &= ~dead
+    info.out_cards = [c for c in range(NUM_CARDS) if out_mask >> c & 1]
+    return info
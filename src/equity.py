@@ -0,0 +1,322 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import combinations
+from math import comb
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.cards import NUM_CARDS, card_ids
+from src.isomorphism import canonicalize
+from src.poker_engine import HandEvaluator
+
+
+DEFAULT_SAMPLES = 20000
+BATCH_SIZE = 5000
+Z_95 = 1.96
+EQUITY_CACHE_SIZE = 4096
+
+# A Monte Carlo sample costs one shuffle plus one evaluation per seat, roughly
+# this many enumerated evaluations.
+SAMPLE_COST = 3
+
+MIN_PLAYERS = 2
+MAX_PLAYERS = 10
+PARALLEL_CHUNK_SAMPLES = 25000
+PARALLEL_MIN_SAMPLES = 100000
+
+# Each Omaha sample evaluates 60 five-card combos per seat.
+OMAHA_MAX_SAMPLES = 2000
+OMAHA_BATCH_SIZE = 500
+
+_equity_tables = None
+_equity_pool: Optional[ProcessPoolExecutor] = None
+_equity_pool_workers = 0
+
+
+@dataclass
+class EquityResult:
+    equity: float
+    std_error: float
+    ci_low: float
+    ci_high: float
+    samples: int
+    method: str = 'monte_carlo'
+
+    def to_dict(self) -> Dict:
+        return {
+            'equity': self.equity,
+            'std_error': self.std_error,
+            'ci': [self.ci_low, self.ci_high],
+            'samples': self.samples,
+            'method': self.method
+        }
+
+
+def remaining_cards(dead: Sequence[int]) -> np.ndarray:
+    alive = np.ones(NUM_CARDS, dtype=bool)
+    alive[list(dead)] = False
+    return np.flatnonzero(alive)
+
+
+def showdown_shares(hero: np.ndarray, opponents: np.ndarray) -> np.ndarray:
+    best_opp = opponents.max(axis=1)
+    ties = (opponents == hero[:, None]).sum(axis=1)
+    return np.where(hero > best_opp, 1.0, np.where(hero == best_opp, 1.0 / (ties + 1), 0.0))
+
+
+def _evaluate_holdings(holes: np.ndarray, boards: np.ndarray) -> np.ndarray:
+    if holes.shape[1] == 4:
+        return HandEvaluator.evaluate_omaha_batch(holes, boards)
+    return HandEvaluator.evaluate_batch(np.concatenate([holes, boards], axis=1))
+
+
+def _sample_batch(hole: List[int], board: List[int], remaining: np.ndarray,
+                  num_opponents: int, size: int, rng: np.random.Generator) -> np.ndarray:
+    # Opponents get as many hole cards as the hero, so this serves Hold'em and Omaha.
+    hole_size = len(hole)
+    board_needed = 5 - len(board)
+    drawn = rng.permuted(np.broadcast_to(remaining, (size, len(remaining))), axis=1)
+    drawn = drawn[:, :board_needed + hole_size * num_opponents]
+
+    full_board = np.concatenate(
+        [np.broadcast_to(np.array(board, dtype=np.int64), (size, len(board))), drawn[:, :board_needed]],
+        axis=1
+    )
+    hero = _evaluate_holdings(np.broadcast_to(np.array(hole, dtype=np.int64), (size, hole_size)), full_board)
+
+    opponents = np.empty((size, num_opponents), dtype=hero.dtype)
+    for k in range(num_opponents):
+        start = board_needed + hole_size * k
+        opponents[:, k] = _evaluate_holdings(drawn[:, start:start + hole_size], full_board)
+
+    return showdown_shares(hero, opponents)
+
+
+def omaha_equity(hole_cards: Sequence, community_cards: Sequence = (),
+                 num_opponents: int = 1,
+                 samples: Optional[int] = OMAHA_MAX_SAMPLES,
+                 time_budget: Optional[float] = None,
+                 rng: Optional[np.random.Generator] = None) -> EquityResult:
+    hole = card_ids(hole_cards)
+    board = card_ids(community_cards)
+    if len(hole) != 4:
+        raise ValueError("Omaha equity requires exactly four hole cards")
+    if len(board) > 5:
+        raise ValueError("Board cannot have more than five cards")
+    if num_opponents < 1 or 5 - len(board) + 4 * num_opponents > NUM_CARDS - 4 - len(board):
+        raise ValueError(f"Invalid number of opponents: {num_opponents}")
+    if samples is None and time_budget is None:
+        raise ValueError("Either samples or time_budget must be set")
+
+    rng = rng or np.random.default_rng()
+    deadline = time.perf_counter() + time_budget if time_budget is not None else None
+    return _result_from_sums(*_monte_carlo_sums(hole, board, num_opponents, samples, deadline, rng))
+
+
+def _validate(hole: List[int], board: List[int], num_opponents: int):
+    if len(hole) != 2:
+        raise ValueError("Equity requires exactly two hole cards")
+    if len(board) > 5:
+        raise ValueError("Board cannot have more than five cards")
+    if num_opponents < 1 or 5 - len(board) + 2 * num_opponents > NUM_CARDS - 2 - len(board):
+        raise ValueError(f"Invalid number of opponents: {num_opponents}")
+
+
+def _monte_carlo_sums(hole: List[int], board: List[int], num_opponents: int,
+                      samples: Optional[int], deadline: Optional[float],
+                      rng: np.random.Generator) -> Tuple[float, float, int]:
+    remaining = remaining_cards(hole + board)
+    batch_size = OMAHA_BATCH_SIZE if len(hole) == 4 else BATCH_SIZE
+    total = 0.0
+    total_sq = 0.0
+    taken = 0
+
+    while True:
+        size = batch_size if samples is None else min(batch_size, samples - taken)
+        shares = _sample_batch(hole, board, remaining, num_opponents, size, rng)
+        total += float(shares.sum())
+        total_sq += float(np.square(shares).sum())
+        taken += size
+
+        if samples is not None and taken >= samples:
+            break
+        if deadline is not None and time.perf_counter() >= deadline:
+            break
+
+    return total, total_sq, taken
+
+
+def monte_carlo_equity(hole_cards: Sequence, community_cards: Sequence = (),
+                       num_opponents: int = 1,
+                       samples: Optional[int] = DEFAULT_SAMPLES,
+                       time_budget: Optional[float] = None,
+                       rng: Optional[np.random.Generator] = None) -> EquityResult:
+    hole = card_ids(hole_cards)
+    board = card_ids(community_cards)
+    _validate(hole, board, num_opponents)
+    if samples is None and time_budget is None:
+        raise ValueError("Either samples or time_budget must be set")
+
+    rng = rng or np.random.default_rng()
+    deadline = time.perf_counter() + time_budget if time_budget is not None else None
+    return _result_from_sums(*_monte_carlo_sums(hole, board, num_opponents, samples, deadline, rng))
+
+
+def _monte_carlo_chunk(args) -> Tuple[float, float, int]:
+    hole, board, num_opponents, samples, wall_deadline, seed = args
+    deadline = None
+    if wall_deadline is not None:
+        # The deadline is wall-clock time shared by every chunk, so a chunk that
+        # waited in the pool queue past it stops after a single batch.
+        deadline = time.perf_counter() + max(0.0, wall_deadline - time.time())
+    return _monte_carlo_sums(hole, board, num_opponents, samples, deadline, np.random.default_rng(seed))
+
+
+def get_equity_pool(workers: Optional[int] = None) -> ProcessPoolExecutor:
+    global _equity_pool, _equity_pool_workers
+    if _equity_pool is None:
+        _equity_pool_workers = workers or os.cpu_count() or 1
+        _equity_pool = ProcessPoolExecutor(max_workers=_equity_pool_workers)
+    elif workers is not None and workers != _equity_pool_workers:
+        raise ValueError(f"Equity pool already running with {_equity_pool_workers} workers, "
+                         f"shut it down before requesting {workers}")
+    return _equity_pool
+
+
+def equity_pool_workers() -> int:
+    return _equity_pool_workers
+
+
+def shutdown_equity_pool():
+    global _equity_pool, _equity_pool_workers
+    if _equity_pool is not None:
+        _equity_pool.shutdown()
+        _equity_pool = None
+        _equity_pool_workers = 0
+
+
+def multiway_equity(hole_cards: Sequence, community_cards: Sequence = (),
+                    num_players: int = 2,
+                    samples: Optional[int] = DEFAULT_SAMPLES,
+                    time_budget: Optional[float] = None,
+                    seed: Optional[int] = None,
+                    workers: Optional[int] = None) -> EquityResult:
+    if not MIN_PLAYERS <= num_players <= MAX_PLAYERS:
+        raise ValueError(f"Multiway equity supports {MIN_PLAYERS}-{MAX_PLAYERS} players, got {num_players}")
+    hole = card_ids(hole_cards)
+    board = card_ids(community_cards)
+    num_opponents = num_players - 1
+    _validate(hole, board, num_opponents)
+    if samples is None and time_budget is None:
+        raise ValueError("Either samples or time_budget must be set")
+
+    pool = get_equity_pool(workers)
+    wall_deadline = None
+    if samples is not None:
+        # Chunking depends only on the sample count, so the merged result for a
+        # given seed does not change with the number of workers.
+        sizes = [min(PARALLEL_CHUNK_SAMPLES, samples - i) for i in range(0, samples, PARALLEL_CHUNK_SAMPLES)]
+    else:
+        sizes = [None] * _equity_pool_workers
+        wall_deadline = time.time() + time_budget
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+
+    total = 0.0
+    total_sq = 0.0
+    taken = 0
+    chunks = [(hole, board, num_opponents, size, wall_deadline, chunk_seed)
+              for size, chunk_seed in zip(sizes, seeds)]
+    for chunk_total, chunk_sq, chunk_taken in pool.map(_monte_carlo_chunk, chunks):
+        total += chunk_total
+        total_sq += chunk_sq
+        taken += chunk_taken
+
+    return _result_from_sums(total, total_sq, taken)
+
+
+def _result_from_sums(total: float, total_sq: float, n: int, method: str = 'monte_carlo') -> EquityResult:
+    mean = total / n
+    variance = max(0.0, total_sq / n - mean * mean)
+    std_error = float(np.sqrt(variance / n))
+    return EquityResult(
+        equity=mean,
+        std_error=std_error,
+        ci_low=max(0.0, mean - Z_95 * std_error),
+        ci_high=min(1.0, mean + Z_95 * std_error),
+        samples=n,
+        method=method
+    )
+
+
+def exact_equity(hole_cards: Sequence, community_cards: Sequence = ()) -> EquityResult:
+    hole = card_ids(hole_cards)
+    board = card_ids(community_cards)
+    remaining = remaining_cards(hole + board)
+    board_needed = 5 - len(board)
+
+    runout_list = list(combinations(remaining.tolist(), board_needed))
+    runouts = np.array(runout_list, dtype=np.int64).reshape(len(runout_list), board_needed)
+    pairs = np.array(list(combinations(remaining.tolist(), 2)), dtype=np.int64)
+
+    full_boards = np.concatenate([np.broadcast_to(np.array(board, dtype=np.int64), (len(runouts), len(board))), runouts], axis=1)
+    hero = HandEvaluator.evaluate_batch(
+        np.concatenate([np.broadcast_to(np.array(hole, dtype=np.int64), (len(runouts), 2)), full_boards], axis=1)
+    )
+
+    # Every runout is paired with every opponent holding; rows sharing a card are masked out.
+    boards_rep = np.repeat(full_boards, len(pairs), axis=0)
+    pairs_rep = np.tile(pairs, (len(runouts), 1))
+    valid = ~(runouts[:, None, :, None] == pairs[None, :, None, :]).any(axis=(2, 3)).ravel()
+
+    opponents = HandEvaluator.evaluate_batch(np.concatenate([pairs_rep[valid], boards_rep[valid]], axis=1))
+    hero_rep = np.repeat(hero, len(pairs))[valid]
+    shares = np.where(hero_rep > opponents, 1.0, np.where(hero_rep == opponents, 0.5, 0.0))
+
+    equity = float(shares.mean())
+    return EquityResult(equity=equity, std_error=0.0, ci_low=equity, ci_high=equity,
+                        samples=len(shares), method='exact')
+
+
+def enumeration_cost(num_board: int) -> int:
+    remaining = 50 - num_board
+    board_needed = 5 - num_board
+    return comb(remaining, board_needed) * (comb(remaining - board_needed, 2) + 1)
+
+
+@lru_cache(maxsize=EQUITY_CACHE_SIZE)
+def _cached_equity(hole: tuple, board: tuple, num_opponents: int, samples: int) -> EquityResult:
+    if num_opponents == 1 and enumeration_cost(len(board)) <= samples * SAMPLE_COST:
+        return exact_equity(hole, board)
+    if samples >= PARALLEL_MIN_SAMPLES:
+        return multiway_equity(hole, board, num_opponents + 1, samples)
+    return monte_carlo_equity(hole, board, num_opponents, samples)
+
+
+def set_equity_tables(tables) -> None:
+    global _equity_tables
+    _equity_tables = tables
+    _cached_equity.cache_clear()
+
+
+def calculate_equity(hole_cards: Sequence, community_cards: Sequence = (),
+                     num_opponents: int = 1,
+                     samples: Optional[int] = DEFAULT_SAMPLES,
+                     time_budget: Optional[float] = None) -> EquityResult:
+    if len(hole_cards) == 4:
+        return omaha_equity(hole_cards, community_cards, num_opponents, samples, time_budget)
+    if samples is None or time_budget is not None:
+        return monte_carlo_equity(hole_cards, community_cards, num_opponents, samples, time_budget)
+    hole, board = card_ids(hole_cards), card_ids(community_cards)
+    if _equity_tables is not None:
+        stored = _equity_tables.lookup(hole, board, num_opponents)
+        if stored is not None:
+            # Table entries are Monte Carlo estimates; the win/lose variance
+            # p(1 - p) bounds the per-sample variance, ties only lower it.
+            equity, table_samples = stored
+            return _result_from_sums(equity * table_samples, equity * table_samples, table_samples, 'table')
+    hole, board = canonicalize(hole, board)
+    return _cached_equity(hole, board, num_opponents, samples)
@@ -0,0 +1,155 @@
+import argparse
+import os
+import struct
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.cards import card_ids
+from src.equity import DEFAULT_SAMPLES, monte_carlo_equity
+from src.isomorphism import FLOP_ROUNDS, PREFLOP_ROUNDS, get_indexer, hand_from_index, hand_index
+
+
+TABLE_MAGIC = b'CBEQTBL1'
+TABLE_VERSION = 3
+HEADER_FORMAT = '<8sIIIIII'
+HEADER_SIZE = 64
+NUM_PREFLOP_CLASSES = get_indexer(PREFLOP_ROUNDS).size
+NUM_FLOP_CLASSES = get_indexer(FLOP_ROUNDS).size
+MAX_OPPONENTS = 9
+DEFAULT_PREFLOP_SAMPLES = 50000
+
+DEFAULT_TABLES_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'equity_tables.bin')
+
+
+def _align(offset: int, alignment: int = 8) -> int:
+    return (offset + alignment - 1) // alignment * alignment
+
+
+class EquityTables:
+    # The stored equities are Monte Carlo estimates, so the per-street sample
+    # counts are kept to report their real standard error.
+    def __init__(self, preflop: np.ndarray, flop: np.ndarray, preflop_samples: int, flop_samples: int):
+        self.preflop = preflop
+        self.flop = flop
+        self.preflop_samples = preflop_samples
+        self.flop_samples = flop_samples
+
+    @classmethod
+    def load(cls, path: str) -> 'EquityTables':
+        with open(path, 'rb') as f:
+            magic, version, num_preflop, max_opponents, num_flop, preflop_samples, flop_samples = struct.unpack(
+                HEADER_FORMAT, f.read(struct.calcsize(HEADER_FORMAT))
+            )
+        if magic != TABLE_MAGIC or version != TABLE_VERSION:
+            raise ValueError(f"Unsupported equity table file: {path}")
+        if num_preflop != NUM_PREFLOP_CLASSES or num_flop not in (0, NUM_FLOP_CLASSES):
+            raise ValueError(f"Equity table file does not match the hand index: {path}")
+
+        flop_offset = _align(HEADER_SIZE + num_preflop * max_opponents * 4)
+        preflop = np.memmap(path, dtype=np.float32, mode='r',
+                            offset=HEADER_SIZE, shape=(num_preflop, max_opponents))
+        if num_flop:
+            flop = np.memmap(path, dtype=np.float32, mode='r', offset=flop_offset, shape=(num_flop,))
+        else:
+            flop = np.zeros(0, dtype=np.float32)
+        return cls(preflop, flop, preflop_samples, flop_samples)
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        num_preflop, max_opponents = self.preflop.shape
+        header = struct.pack(HEADER_FORMAT, TABLE_MAGIC, TABLE_VERSION,
+                             num_preflop, max_opponents, len(self.flop),
+                             self.preflop_samples, self.flop_samples)
+        flop_offset = _align(HEADER_SIZE + self.preflop.nbytes)
+        with open(path, 'wb') as f:
+            f.write(header.ljust(HEADER_SIZE, b'\0'))
+            f.write(np.ascontiguousarray(self.preflop, dtype=np.float32).tobytes())
+            f.write(b'\0' * (flop_offset - HEADER_SIZE - self.preflop.nbytes))
+            f.write(np.ascontiguousarray(self.flop, dtype=np.float32).tobytes())
+
+    def preflop_lookup(self, hole: Sequence[int], num_opponents: int = 1) -> Optional[float]:
+        if not 1 <= num_opponents <= self.preflop.shape[1]:
+            return None
+        return float(self.preflop[hand_index(hole), num_opponents - 1])
+
+    def flop_lookup(self, hole: Sequence[int], flop: Sequence[int]) -> Optional[float]:
+        if not len(self.flop):
+            return None
+        return float(self.flop[hand_index(hole, flop)])
+
+    def lookup(self, hole_cards: Sequence, community_cards: Sequence = (),
+               num_opponents: int = 1) -> Optional[Tuple[float, int]]:
+        hole = card_ids(hole_cards)
+        board = card_ids(community_cards)
+        equity, samples = None, 0
+        if not board:
+            equity, samples = self.preflop_lookup(hole, num_opponents), self.preflop_samples
+        elif len(board) == 3 and num_opponents == 1:
+            equity, samples = self.flop_lookup(hole, board), self.flop_samples
+        return (equity, samples) if equity is not None else None
+
+
+def load_equity_tables(path: Optional[str] = None) -> Optional[EquityTables]:
+    path = path or os.getenv('EQUITY_TABLES_PATH', DEFAULT_TABLES_PATH)
+    if not os.path.exists(path):
+        print(f"Equity tables not found at {path}, falling back to simulation")
+        return None
+    try:
+        return EquityTables.load(path)
+    except Exception as e:
+        print(f"Could not load equity tables: {e}")
+        return None
+
+
+def _preflop_row(args) -> List[float]:
+    index, samples = args
+    hole, _ = hand_from_index(index)
+    return [monte_carlo_equity(hole, (), n, samples).equity for n in range(1, MAX_OPPONENTS + 1)]
+
+
+def _flop_chunk(args) -> List[float]:
+    start, stop, samples = args
+    return [monte_carlo_equity(*hand_from_index(i, 3), 1, samples).equity for i in range(start, stop)]
+
+
+def build_tables(preflop_samples: int = DEFAULT_PREFLOP_SAMPLES, flop_samples: int = DEFAULT_SAMPLES,
+                 include_flop: bool = True, workers: Optional[int] = None,
+                 chunk_size: int = 2000) -> EquityTables:
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        preflop = np.array(
+            list(pool.map(_preflop_row, [(i, preflop_samples) for i in range(NUM_PREFLOP_CLASSES)])),
+            dtype=np.float32
+        )
+        print(f"Built preflop table ({NUM_PREFLOP_CLASSES} classes)")
+
+        flop = np.zeros(0, dtype=np.float32)
+        if include_flop:
+            chunks = [(i, min(i + chunk_size, NUM_FLOP_CLASSES), flop_samples)
+                      for i in range(0, NUM_FLOP_CLASSES, chunk_size)]
+            flop = np.empty(NUM_FLOP_CLASSES, dtype=np.float32)
+            for done, ((start, stop, _), chunk) in enumerate(zip(chunks, pool.map(_flop_chunk, chunks)), 1):
+                flop[start:stop] = chunk
+                if done % 50 == 0:
+                    print(f"Completed {done}/{len(chunks)} flop chunks")
+
+    return EquityTables(preflop, flop, preflop_samples, flop_samples if include_flop else 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build precomputed preflop/flop equity tables')
+    parser.add_argument('--output', default=DEFAULT_TABLES_PATH)
+    parser.add_argument('--preflop-samples', type=int, default=DEFAULT_PREFLOP_SAMPLES)
+    parser.add_argument('--flop-samples', type=int, default=DEFAULT_SAMPLES)
+    parser.add_argument('--no-flop', action='store_true')
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    tables = build_tables(args.preflop_samples, args.flop_samples, not args.no_flop, args.workers)
+    tables.save(args.output)
+    print(f"Wrote equity tables to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
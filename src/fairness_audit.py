@@ -0,0 +1,161 @@
+import argparse
+import hashlib
+import json
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from src.cards import card_ids
+from src.merkle import verify_proof
+from src.models import HandHistory, MerkleProof, get_session
+from src.poker_engine import SHUFFLE_V1, shuffle_deck
+
+
+DEFAULT_CHUNK_SIZE = 500
+MAX_PENDING_CHUNKS_PER_WORKER = 2
+
+
+def hand_record(row: HandHistory, stored_proof: Optional[MerkleProof] = None) -> Dict:
+    merkle_root, merkle_proof = row.merkle_root, row.merkle_proof
+    if not merkle_root and stored_proof is not None:
+        merkle_root, merkle_proof = stored_proof.root, stored_proof.proof
+    return {
+        'id': row.id,
+        'session_id': row.session_id,
+        'server_seed': row.server_seed,
+        'client_seed': row.client_seed,
+        'commitment': row.commitment,
+        'shuffle_version': row.shuffle_version or SHUFFLE_V1,
+        'player_cards': row.player_cards or {},
+        'community_cards': row.community_cards or [],
+        'merkle_root': merkle_root,
+        'merkle_proof': merkle_proof
+    }
+
+
+def verify_hand(record: Dict) -> Dict:
+    errors = []
+    commitment_checked = False
+    merkle_checked = False
+    server_seed, client_seed = record['server_seed'], record['client_seed']
+
+    if not server_seed or client_seed is None:
+        errors.append('missing seeds')
+    else:
+        # Rows saved before commitments were stored can only have their deal checked.
+        commitment = record.get('commitment')
+        if commitment is not None:
+            commitment_checked = True
+            if hashlib.sha256(server_seed.encode()).hexdigest() != commitment:
+                errors.append('commitment mismatch')
+            if record.get('merkle_root'):
+                merkle_checked = True
+                if not verify_proof(commitment, record.get('merkle_proof') or [], record['merkle_root']):
+                    errors.append('merkle proof mismatch')
+
+        # Cards are dealt as each player's hole cards in seat order, then the board.
+        try:
+            deck = shuffle_deck(server_seed, client_seed, record['shuffle_version'])
+            position = 0
+            for player_id, cards in record['player_cards'].items():
+                dealt = card_ids(cards)
+                if dealt != deck[position:position + len(dealt)]:
+                    errors.append(f'hole cards mismatch for {player_id}')
+                position += len(dealt)
+            board = card_ids(record['community_cards'])
+            if board != deck[position:position + len(board)]:
+                errors.append('community cards mismatch')
+        except ValueError as e:
+            errors.append(str(e))
+
+    return {
+        'id': record['id'],
+        'session_id': record['session_id'],
+        'ok': not errors,
+        'commitment_checked': commitment_checked,
+        'merkle_checked': merkle_checked,
+        'errors': errors
+    }
+
+
+def _verify_chunk(records: List[Dict]) -> List[Dict]:
+    return [verify_hand(record) for record in records]
+
+
+def iter_hand_records(session=None, since_id: int = 0, limit: Optional[int] = None,
+                      batch_size: int = 1000) -> Iterator[Dict]:
+    own_session = session is None
+    session = session or get_session()
+    try:
+        query = (session.query(HandHistory, MerkleProof)
+                 .outerjoin(MerkleProof, MerkleProof.commitment == HandHistory.commitment)
+                 .filter(HandHistory.id > since_id)
+                 .order_by(HandHistory.id))
+        if limit is not None:
+            query = query.limit(limit)
+        for row, stored_proof in query.yield_per(batch_size):
+            yield hand_record(row, stored_proof)
+    finally:
+        if own_session:
+            session.close()
+
+
+def _chunked(records: Iterable[Dict], size: int) -> Iterator[List[Dict]]:
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def audit_hands(records: Iterable[Dict], workers: Optional[int] = None,
+                chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Dict]:
+    if workers == 1:
+        for record in records:
+            yield verify_hand(record)
+        return
+
+    # Only a bounded number of chunks are in flight, so memory stays flat while
+    # results stream back in row order.
+    workers = workers or os.cpu_count()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        max_pending = MAX_PENDING_CHUNKS_PER_WORKER * workers
+        pending = deque()
+        for chunk in _chunked(records, chunk_size):
+            pending.append(pool.submit(_verify_chunk, chunk))
+            if len(pending) >= max_pending:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Verify commitments and shuffles of stored hand histories')
+    parser.add_argument('--since-id', type=int, default=0)
+    parser.add_argument('--limit', type=int, default=None)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument('--failures-only', action='store_true')
+    args = parser.parse_args()
+
+    checked = failed = unanchored = 0
+    for finding in audit_hands(iter_hand_records(since_id=args.since_id, limit=args.limit),
+                               args.workers, args.chunk_size):
+        checked += 1
+        failed += not finding['ok']
+        unanchored += finding['commitment_checked'] and not finding['merkle_checked']
+        if not args.failures_only or not finding['ok']:
+            print(json.dumps(finding), flush=True)
+
+    print(f"Checked {checked} hands, {failed} failed, {unanchored} with a commitment but no Merkle proof",
+          file=sys.stderr)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
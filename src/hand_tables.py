@@ -0,0 +1,143 @@
+from typing import Dict, List
+
+import numpy as np
+
+
+HAND_CATEGORIES = [
+    'high_card',
+    'pair',
+    'two_pair',
+    'three_of_a_kind',
+    'straight',
+    'flush',
+    'full_house',
+    'four_of_a_kind',
+    'straight_flush',
+    'royal_flush'
+]
+
+KICKER_COUNTS = [5, 4, 3, 3, 5, 5, 2, 2, 5, 5]
+
+# Packed strength: category in bits 20+, then up to five 4-bit kicker ranks from bit 16
+# down, so comparing two strengths as integers orders the hands.
+CATEGORY_SHIFT = 20
+NUM_RANKS = 13
+
+# Rank counts are packed base-5 so a hand's rank key is the sum of its cards' weights.
+RANK_WEIGHTS = [5 ** i for i in range(NUM_RANKS)]
+
+STRAIGHT_WINDOWS = [(high, sum(1 << (r - 2) for r in range(high - 4, high + 1)))
+                    for high in range(14, 5, -1)]
+STRAIGHT_WINDOWS.append((5, (1 << 12) | 0b1111))
+
+
+def pack_strength(category: int, kickers: List[int]) -> int:
+    strength = category << CATEGORY_SHIFT
+    for i, k in enumerate(kickers[:5]):
+        strength |= k << (16 - 4 * i)
+    return strength
+
+
+def unpack_strength(strength: int):
+    category = strength >> CATEGORY_SHIFT
+    kickers = [(strength >> (16 - 4 * i)) & 0xF for i in range(KICKER_COUNTS[category])]
+    return category, HAND_CATEGORIES[category], kickers
+
+
+def straight_high(rank_mask: int) -> int:
+    for high, window in STRAIGHT_WINDOWS:
+        if rank_mask & window == window:
+            return high
+    return 0
+
+
+def _straight_kickers(high: int) -> List[int]:
+    if high == 5:
+        return [5, 4, 3, 2, 1]
+    return list(range(high, high - 5, -1))
+
+
+def _flush_strength(rank_mask: int) -> int:
+    high = straight_high(rank_mask)
+    if high == 14:
+        return pack_strength(9, _straight_kickers(high))
+    if high:
+        return pack_strength(8, _straight_kickers(high))
+    ranks = [r for r in range(14, 1, -1) if rank_mask & (1 << (r - 2))]
+    return pack_strength(5, ranks[:5])
+
+
+def _rank_strength(counts: List[int]) -> int:
+    by_count = {4: [], 3: [], 2: [], 1: []}
+    rank_mask = 0
+    for r in range(14, 1, -1):
+        c = counts[r - 2]
+        if c:
+            by_count[c].append(r)
+            rank_mask |= 1 << (r - 2)
+    present = [r for r in range(14, 1, -1) if counts[r - 2]]
+    quads, trips, pairs = by_count[4], by_count[3], by_count[2]
+
+    if quads:
+        q = quads[0]
+        return pack_strength(7, [q] + [r for r in present if r != q][:1])
+
+    if trips and (len(trips) > 1 or pairs):
+        t = trips[0]
+        return pack_strength(6, [t, max(trips[1:] + pairs)])
+
+    high = straight_high(rank_mask)
+    if high:
+        return pack_strength(4, _straight_kickers(high))
+
+    if trips:
+        t = trips[0]
+        return pack_strength(3, [t] + [r for r in present if r != t][:2])
+
+    if len(pairs) >= 2:
+        p1, p2 = pairs[0], pairs[1]
+        return pack_strength(2, [p1, p2] + [r for r in present if r not in (p1, p2)][:1])
+
+    if pairs:
+        p = pairs[0]
+        return pack_strength(1, [p] + [r for r in present if r != p][:3])
+
+    return pack_strength(0, present[:5])
+
+
+def _enumerate_counts(min_cards: int, max_cards: int):
+    counts = [0] * NUM_RANKS
+
+    def walk(rank: int, remaining: int, key: int):
+        if rank == NUM_RANKS:
+            if max_cards - remaining >= min_cards:
+                yield key, counts
+            return
+        weight = RANK_WEIGHTS[rank]
+        for c in range(min(4, remaining) + 1):
+            counts[rank] = c
+            yield from walk(rank + 1, remaining - c, key + c * weight)
+        counts[rank] = 0
+
+    yield from walk(0, max_cards, 0)
+
+
+def build_rank_table(min_cards: int = 5, max_cards: int = 7) -> Dict[int, int]:
+    return {key: _rank_strength(counts) for key, counts in _enumerate_counts(min_cards, max_cards)}
+
+
+def build_flush_table() -> List[int]:
+    table = [0] * (1 << NUM_RANKS)
+    for mask in range(1 << NUM_RANKS):
+        if bin(mask).count('1') >= 5:
+            table[mask] = _flush_strength(mask)
+    return table
+
+
+RANK_TABLE = build_rank_table(min_cards=1)
+FLUSH_TABLE = build_flush_table()
+
+# Sorted key/value arrays and a dense flush array for vectorized (NumPy) lookups.
+RANK_TABLE_KEYS = np.array(sorted(RANK_TABLE), dtype=np.int64)
+RANK_TABLE_VALUES = np.array([RANK_TABLE[k] for k in RANK_TABLE_KEYS.tolist()], dtype=np.int32)
+FLUSH_TABLE_ARRAY = np.array(FLUSH_TABLE, dtype=np.int32)
@@ -0,0 +1,228 @@
+from bisect import bisect_right
+from functools import lru_cache
+from itertools import combinations_with_replacement
+from math import comb
+from typing import Dict, List, Sequence, Tuple
+
+from src.cards import card_ids
+
+
+NUM_SUITS = 4
+NUM_RANKS = 13
+
+PREFLOP_ROUNDS = (2,)
+FLOP_ROUNDS = (2, 3)
+TURN_ROUNDS = (2, 4)
+RIVER_ROUNDS = (2, 5)
+
+
+def _popcount(x: int) -> int:
+    return bin(x).count('1')
+
+
+def _colex(mask: int) -> int:
+    index = 0
+    i = 1
+    r = 0
+    while mask:
+        if mask & 1:
+            index += comb(r, i)
+            i += 1
+        mask >>= 1
+        r += 1
+    return index
+
+
+def _uncolex(index: int, k: int) -> int:
+    mask = 0
+    for i in range(k, 0, -1):
+        r = i - 1
+        while comb(r + 1, i) <= index:
+            r += 1
+        index -= comb(r, i)
+        mask |= 1 << r
+    return mask
+
+
+def _compress(mask: int, used: int) -> int:
+    out = 0
+    pos = 0
+    for r in range(NUM_RANKS):
+        bit = 1 << r
+        if used & bit:
+            continue
+        if mask & bit:
+            out |= 1 << pos
+        pos += 1
+    return out
+
+
+def _expand(mask: int, used: int) -> int:
+    out = 0
+    pos = 0
+    for r in range(NUM_RANKS):
+        bit = 1 << r
+        if used & bit:
+            continue
+        if mask & (1 << pos):
+            out |= bit
+        pos += 1
+    return out
+
+
+# Each suit's cards form a column of per-round rank masks, and a hand's suit-isomorphism
+# class is the multiset of its four columns. The dense index is the offset of the
+# configuration (sorted column shapes) plus a combinations-with-repetition rank for each
+# group of suits sharing a shape.
+class HandIndexer:
+    def __init__(self, rounds: Sequence[int]):
+        self.rounds = tuple(rounds)
+        self.num_rounds = len(self.rounds)
+
+        shapes = [()]
+        for count in self.rounds:
+            shapes = [s + (c,) for s in shapes for c in range(count + 1)
+                      if sum(s) + c <= NUM_RANKS]
+        self.shape_sizes: Dict[Tuple[int, ...], int] = {s: self._shape_size(s) for s in shapes}
+
+        self.configs: List[Tuple[Tuple[int, ...], ...]] = []
+        self.config_groups: List[List[Tuple[Tuple[int, ...], int, int]]] = []
+        self.config_offsets: List[int] = []
+        self._config_positions: Dict[Tuple[Tuple[int, ...], ...], int] = {}
+
+        offset = 0
+        for combo in combinations_with_replacement(sorted(shapes, reverse=True), NUM_SUITS):
+            if any(sum(s[r] for s in combo) != self.rounds[r] for r in range(self.num_rounds)):
+                continue
+            groups = []
+            for shape in combo:
+                if groups and groups[-1][0] == shape:
+                    groups[-1][1] += 1
+                else:
+                    groups.append([shape, 1])
+            groups = [(shape, m, comb(self.shape_sizes[shape] + m - 1, m)) for shape, m in groups]
+            size = 1
+            for _, _, group_size in groups:
+                size *= group_size
+
+            self._config_positions[combo] = len(self.configs)
+            self.configs.append(combo)
+            self.config_groups.append(groups)
+            self.config_offsets.append(offset)
+            offset += size
+
+        self.size = offset
+
+    @staticmethod
+    def _shape_size(shape: Tuple[int, ...]) -> int:
+        size = 1
+        used = 0
+        for count in shape:
+            size *= comb(NUM_RANKS - used, count)
+            used += count
+        return size
+
+    def _columns(self, cards_by_round: Sequence[Sequence[int]]) -> List[Tuple[int, ...]]:
+        if tuple(len(cards) for cards in cards_by_round) != self.rounds:
+            raise ValueError(f"Expected rounds of {self.rounds} cards")
+        columns = [[0] * self.num_rounds for _ in range(NUM_SUITS)]
+        for r, cards in enumerate(cards_by_round):
+            for c in cards:
+                columns[c & 3][r] |= 1 << (c >> 2)
+        return [tuple(col) for col in columns]
+
+    def _column_key(self, column: Tuple[int, ...]) -> Tuple[Tuple[int, ...], int]:
+        shape = tuple(_popcount(m) for m in column)
+        index = 0
+        used = 0
+        for r, mask in enumerate(column):
+            index = index * comb(NUM_RANKS - _popcount(used), shape[r]) + _colex(_compress(mask, used))
+            used |= mask
+        return shape, index
+
+    def _column_from_key(self, shape: Tuple[int, ...], index: int) -> Tuple[int, ...]:
+        digits = [0] * self.num_rounds
+        for r in range(self.num_rounds - 1, -1, -1):
+            radix = comb(NUM_RANKS - sum(shape[:r]), shape[r])
+            index, digits[r] = divmod(index, radix)
+        column = []
+        used = 0
+        for r, digit in enumerate(digits):
+            mask = _expand(_uncolex(digit, shape[r]), used)
+            column.append(mask)
+            used |= mask
+        return tuple(column)
+
+    def _sorted_columns(self, cards_by_round: Sequence[Sequence[int]]):
+        keyed = [(self._column_key(col), col) for col in self._columns(cards_by_round)]
+        keyed.sort(reverse=True)
+        return keyed
+
+    def index(self, cards_by_round: Sequence[Sequence[int]]) -> int:
+        keyed = self._sorted_columns(cards_by_round)
+        position = self._config_positions[tuple(key[0] for key, _ in keyed)]
+
+        index = 0
+        i = 0
+        for shape, m, group_size in self.config_groups[position]:
+            ascending = [keyed[j][0][1] for j in range(i + m - 1, i - 1, -1)]
+            multiset_index = sum(comb(y + j, j + 1) for j, y in enumerate(ascending))
+            index = index * group_size + multiset_index
+            i += m
+        return self.config_offsets[position] + index
+
+    def unindex(self, index: int) -> List[Tuple[int, ...]]:
+        if not 0 <= index < self.size:
+            raise ValueError(f"Index {index} out of range for {self.size} classes")
+        position = bisect_right(self.config_offsets, index) - 1
+        remainder = index - self.config_offsets[position]
+        groups = self.config_groups[position]
+
+        multiset_indices = [0] * len(groups)
+        for g in range(len(groups) - 1, -1, -1):
+            remainder, multiset_indices[g] = divmod(remainder, groups[g][2])
+
+        columns = []
+        for (shape, m, _), multiset_index in zip(groups, multiset_indices):
+            positions = _uncolex(multiset_index, m)
+            ascending = [r - j for j, r in enumerate(b for b in range(positions.bit_length()) if positions >> b & 1)]
+            columns.extend(self._column_from_key(shape, y) for y in reversed(ascending))
+
+        return self._cards_from_columns(columns)
+
+    def canonicalize(self, cards_by_round: Sequence[Sequence[int]]) -> List[Tuple[int, ...]]:
+        return self._cards_from_columns([col for _, col in self._sorted_columns(cards_by_round)])
+
+    def _cards_from_columns(self, columns: Sequence[Tuple[int, ...]]) -> List[Tuple[int, ...]]:
+        cards_by_round = []
+        for r in range(self.num_rounds):
+            cards = [rank * 4 + suit
+                     for suit, column in enumerate(columns)
+                     for rank in range(NUM_RANKS) if column[r] >> rank & 1]
+            cards_by_round.append(tuple(sorted(cards)))
+        return cards_by_round
+
+
+@lru_cache(maxsize=None)
+def get_indexer(rounds: Tuple[int, ...]) -> HandIndexer:
+    return HandIndexer(rounds)
+
+
+def street_rounds(num_board: int) -> Tuple[int, ...]:
+    return (2,) if num_board == 0 else (2, num_board)
+
+
+def canonicalize(hole_cards: Sequence, community_cards: Sequence = ()) -> Tuple[Tuple[int, ...], Tuple[int, ...]]:
+    hole, board = card_ids(hole_cards), card_ids(community_cards)
+    canonical = get_indexer(street_rounds(len(board))).canonicalize([hole, board] if board else [hole])
+    return canonical[0], canonical[1] if board else ()
+
+
+def hand_index(hole_cards: Sequence, community_cards: Sequence = ()) -> int:
+    hole, board = card_ids(hole_cards), card_ids(community_cards)
+    return get_indexer(street_rounds(len(board))).index([hole, board] if board else [hole])
+
+
+def hand_from_index(index: int, num_board: int = 0) -> Tuple[Tuple[int, ...], Tuple[int, ...]]:
+    cards = get_indexer(street_rounds(num_board)).unindex(index)
+    return cards[0], cards[1] if num_board else ()
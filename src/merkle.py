@@ -0,0 +1,110 @@
+import hashlib
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+DEFAULT_WINDOW_SECONDS = 60.0
+RECENT_BATCHES = 16
+
+
+# Leaves and inner nodes are hashed with distinct prefixes so a leaf can never
+# be passed off as an inner node. A node without a sibling is carried up unchanged.
+def leaf_hash(commitment: str) -> bytes:
+    return hashlib.sha256(b'\x00' + commitment.encode()).digest()
+
+
+def node_hash(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(b'\x01' + left + right).digest()
+
+
+def build_tree(commitments: List[str]) -> Tuple[str, List[List[List[str]]]]:
+    if not commitments:
+        raise ValueError("Cannot build a Merkle tree without leaves")
+    level = [leaf_hash(c) for c in commitments]
+    positions = list(range(len(commitments)))
+    proofs: List[List[List[str]]] = [[] for _ in commitments]
+
+    while len(level) > 1:
+        for leaf, pos in enumerate(positions):
+            sibling = pos ^ 1
+            if sibling < len(level):
+                side = 'left' if sibling < pos else 'right'
+                proofs[leaf].append([side, level[sibling].hex()])
+        level = [node_hash(level[i], level[i + 1]) if i + 1 < len(level) else level[i]
+                 for i in range(0, len(level), 2)]
+        positions = [pos // 2 for pos in positions]
+
+    return level[0].hex(), proofs
+
+
+def verify_proof(commitment: str, proof: List[List[str]], root: str) -> bool:
+    node = leaf_hash(commitment)
+    for side, sibling in proof:
+        sibling = bytes.fromhex(sibling)
+        node = node_hash(sibling, node) if side == 'left' else node_hash(node, sibling)
+    return node.hex() == root
+
+
+class CommitmentBatcher:
+    def __init__(self, window_seconds: float = DEFAULT_WINDOW_SECONDS,
+                 on_flush: Optional[Callable[[str, str, Dict[str, List[List[str]]]], None]] = None):
+        self.window_seconds = window_seconds
+        self.on_flush = on_flush
+        self._lock = threading.Lock()
+        self._pending: List[str] = []
+        self._window_start: Optional[float] = None
+        self._recent: OrderedDict = OrderedDict()
+        self._proofs: Dict[str, Dict] = {}
+        self.batches_flushed = 0
+
+    def add(self, commitment: str):
+        with self._lock:
+            if not self._pending:
+                self._window_start = time.monotonic()
+            self._pending.append(commitment)
+
+    def flush_if_due(self) -> Optional[str]:
+        with self._lock:
+            due = self._pending and time.monotonic() - self._window_start >= self.window_seconds
+        return self.flush() if due else None
+
+    def flush(self) -> Optional[str]:
+        with self._lock:
+            if not self._pending:
+                return None
+            commitments, self._pending = self._pending, []
+            batch_id = secrets.token_hex(8)
+            root, proofs = build_tree(commitments)
+            by_commitment = dict(zip(commitments, proofs))
+
+            # Keep proofs of the last few batches for hands saved after their batch closed.
+            self._recent[batch_id] = list(by_commitment)
+            for c, proof in by_commitment.items():
+                self._proofs[c] = {'batch_id': batch_id, 'root': root, 'proof': proof}
+            while len(self._recent) > RECENT_BATCHES:
+                _, expired = self._recent.popitem(last=False)
+                for c in expired:
+                    self._proofs.pop(c, None)
+            self.batches_flushed += 1
+
+        if self.on_flush is not None:
+            try:
+                self.on_flush(batch_id, root, by_commitment)
+            except Exception as e:
+                print(f"Merkle batch {batch_id} flush callback failed: {e}")
+        return root
+
+    def proof_for(self, commitment: str) -> Optional[Dict]:
+        with self._lock:
+            return self._proofs.get(commitment)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'pending': len(self._pending),
+                'window_seconds': self.window_seconds,
+                'batches_flushed': self.batches_flushed
+            }
@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine, Column, Integer, String, JSON, Float, DateTime, Text
+from sqlalchemy import create_engine, inspect, text, Column, Integer, String, JSON, Float, DateTime, Text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from datetime import datetime
@@ -49,6 +49,21 @@ class HandHistory(Base):
     hand_rank = Column(String(64))
     server_seed = Column(String(128))
     client_seed = Column(String(128))
+    commitment = Column(String(128), index=True)
+    shuffle_version = Column(Integer, default=1)
+    merkle_batch = Column(String(64))
+    merkle_root = Column(String(64))
+    merkle_proof = Column(JSON)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class MerkleProof(Base):
+    __tablename__ = 'merkle_proofs'
+    
+    commitment = Column(String(128), primary_key=True)
+    batch_id = Column(String(64), index=True)
+    root = Column(String(64))
+    proof = Column(JSON)
     created_at = Column(DateTime, default=datetime.utcnow)
 
 
@@ -63,7 +78,28 @@ def get_session():
     return Session()
 
 
+def _add_missing_columns(engine):
+    # create_all does not alter existing tables, so columns added to a model
+    # later are appended here; old rows get the column default.
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {c['name'] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                column_type = column.type.compile(engine.dialect)
+                default = column.default.arg if column.default is not None and column.default.is_scalar else None
+                ddl = f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'
+                if default is not None:
+                    ddl += f' DEFAULT {default!r}'
+                conn.execute(text(ddl))
+
+
 def init_db():
     engine = get_engine()
     Base.metadata.create_all(engine)
+    _add_missing_columns(engine)
     return engine
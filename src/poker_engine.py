@@ -1,32 +1,85 @@
 import hashlib
+import hmac
+import random
 import secrets
 from typing import List, Tuple, Optional, Dict
 from dataclasses import dataclass, field
 import json
+import threading
+from collections import OrderedDict
+from itertools import combinations
 
+import numpy as np
 
-RANKS = ['2', '3', '4', '5', '6', '7', '8', '9', 'T', 'J', 'Q', 'K', 'A']
-SUITS = ['h', 'd', 'c', 's']
-RANK_VALUES = {r: i for i, r in enumerate(RANKS, 2)}
+from src.cards import (
+    RANKS, SUITS, RANK_VALUES, NUM_CARDS, CARDS, CARD_RANK_BITS, CARD_RANKS, Card
+)
+from src.hand_tables import (
+    RANK_TABLE, FLUSH_TABLE, RANK_WEIGHTS, RANK_TABLE_KEYS, RANK_TABLE_VALUES,
+    FLUSH_TABLE_ARRAY, HAND_CATEGORIES, CATEGORY_SHIFT, unpack_strength
+)
 
 
-@dataclass
-class Card:
-    rank: str
-    suit: str
+CARD_RANK_WEIGHTS = [RANK_WEIGHTS[r] for r in CARD_RANKS]
+CARD_RANK_WEIGHTS_ARRAY = np.array(CARD_RANK_WEIGHTS, dtype=np.int64)
+CARD_RANK_BITS_ARRAY = np.array(CARD_RANK_BITS, dtype=np.int32)
+
+# Omaha hands use exactly two of four hole cards and three board cards.
+OMAHA_HOLE_PAIRS = np.array(list(combinations(range(4), 2)), dtype=np.int64)
+OMAHA_BOARD_TRIPLES = np.array(list(combinations(range(5), 3)), dtype=np.int64)
+
+
+class HandState:
+    __slots__ = ('rank_key', 'suit_masks', 'card_mask', 'num_cards', 'flush_strength', 'strength')
     
-    def __str__(self):
-        return f"{self.rank}{self.suit}"
+    def __init__(self, card_ids: Optional[List[int]] = None):
+        self.reset()
+        if card_ids:
+            self.add_cards(card_ids)
     
-    def __repr__(self):
-        return str(self)
+    def reset(self):
+        self.rank_key = 0
+        self.suit_masks = [0, 0, 0, 0]
+        self.card_mask = 0
+        self.num_cards = 0
+        self.flush_strength = 0
+        self.strength = 0
     
-    def to_dict(self):
-        return {'rank': self.rank, 'suit': self.suit}
+    def add_card(self, card_id: int):
+        suit = card_id & 3
+        self.rank_key += CARD_RANK_WEIGHTS[card_id]
+        self.suit_masks[suit] |= CARD_RANK_BITS[card_id]
+        self.card_mask |= 1 << card_id
+        self.num_cards += 1
+        
+        # A flush in seven cards outranks anything the rank counts can make.
+        self.flush_strength = max(self.flush_strength, FLUSH_TABLE[self.suit_masks[suit]])
+        self.strength = self.flush_strength or RANK_TABLE[self.rank_key]
     
-    @staticmethod
-    def from_dict(d):
-        return Card(d['rank'], d['suit'])
+    def add_cards(self, card_ids: List[int]):
+        for card_id in card_ids:
+            self.add_card(card_id)
+    
+    def strength_with(self, card_ids: List[int]) -> int:
+        rank_key = self.rank_key
+        touched = {}
+        for card_id in card_ids:
+            suit = card_id & 3
+            rank_key += CARD_RANK_WEIGHTS[card_id]
+            touched[suit] = touched.get(suit, self.suit_masks[suit]) | CARD_RANK_BITS[card_id]
+        
+        flush_strength = self.flush_strength
+        for mask in touched.values():
+            flush_strength = max(flush_strength, FLUSH_TABLE[mask])
+        return flush_strength or RANK_TABLE[rank_key]
+    
+    @property
+    def category(self) -> int:
+        return HandEvaluator.category(self.strength)
+    
+    @property
+    def category_name(self) -> str:
+        return HandEvaluator.category_name(self.strength)
 
 
 @dataclass
@@ -39,6 +92,7 @@ class Player:
     is_folded: bool = False
     is_all_in: bool = False
     wallet_address: str = ""
+    hand_state: HandState = field(default_factory=HandState, repr=False, compare=False)
     
     def to_dict(self):
         return {
@@ -53,8 +107,105 @@ class Player:
         }
 
 
+SHUFFLE_V1 = 1
+SHUFFLE_V2 = 2
+SHUFFLE_VERSIONS = (SHUFFLE_V1, SHUFFLE_V2)
+CURRENT_SHUFFLE_VERSION = SHUFFLE_V2
+
+
+def seed_hash(server_seed: str, client_seed: str) -> bytes:
+    return hashlib.sha256((server_seed + client_seed).encode()).digest()
+
+
+def _shuffle_v1(digest: bytes) -> List[int]:
+    # Legacy: Mersenne Twister seeded from the first four bytes of the hash.
+    deck = list(range(NUM_CARDS))
+    random.Random(int.from_bytes(digest[:4], 'big')).shuffle(deck)
+    return deck
+
+
+def _hmac_stream(key: bytes):
+    counter = 0
+    while True:
+        block = hmac.new(key, counter.to_bytes(8, 'big'), hashlib.sha256).digest()
+        for offset in range(0, len(block), 4):
+            yield int.from_bytes(block[offset:offset + 4], 'big')
+        counter += 1
+
+
+def _shuffle_v2(digest: bytes) -> List[int]:
+    # Fisher-Yates over 32-bit words of HMAC-SHA256(hash, counter); words at or
+    # above the largest multiple of i + 1 are rejected so every swap is uniform.
+    deck = list(range(NUM_CARDS))
+    words = _hmac_stream(digest)
+    for i in range(NUM_CARDS - 1, 0, -1):
+        bound = i + 1
+        limit = (1 << 32) - (1 << 32) % bound
+        word = next(words)
+        while word >= limit:
+            word = next(words)
+        j = word % bound
+        deck[i], deck[j] = deck[j], deck[i]
+    return deck
+
+
+# Fisher-Yates on 52 cards takes 51 words; rejections are rare enough
+# (under 1e-8 per word) that the first blocks almost always suffice.
+SHUFFLE_V2_BLOCKS = (NUM_CARDS - 1 + 7) // 8
+SHUFFLE_V2_BOUNDS = np.arange(NUM_CARDS, 1, -1, dtype=np.uint64)
+SHUFFLE_V2_LIMITS = (1 << 32) - (1 << 32) % SHUFFLE_V2_BOUNDS
+
+
+def _shuffle_v2_batch(digests: List[bytes]) -> np.ndarray:
+    counters = [c.to_bytes(8, 'big') for c in range(SHUFFLE_V2_BLOCKS)]
+    stream = bytearray()
+    for digest in digests:
+        base = hmac.new(digest, digestmod=hashlib.sha256)
+        for counter in counters:
+            block = base.copy()
+            block.update(counter)
+            stream += block.digest()
+    words = np.frombuffer(bytes(stream), dtype='>u4').reshape(len(digests), SHUFFLE_V2_BLOCKS * 8)[:, :NUM_CARDS - 1].astype(np.uint64)
+
+    decks = np.tile(np.arange(NUM_CARDS, dtype=np.uint8), (len(digests), 1))
+    rows = np.arange(len(digests))
+    for t, i in enumerate(range(NUM_CARDS - 1, 0, -1)):
+        j = (words[:, t] % SHUFFLE_V2_BOUNDS[t]).astype(np.int64)
+        swapped = decks[rows, j]
+        decks[rows, j] = decks[:, i]
+        decks[:, i] = swapped
+
+    # A rejected word shifts the rest of that deck's stream, so redo those decks one at a time.
+    for k in np.flatnonzero((words >= SHUFFLE_V2_LIMITS).any(axis=1)):
+        decks[k] = _shuffle_v2(digests[k])
+    return decks
+
+
+def shuffle_decks(seed_pairs: List[Tuple[str, str]], version: int = CURRENT_SHUFFLE_VERSION) -> np.ndarray:
+    digests = [seed_hash(server_seed, client_seed) for server_seed, client_seed in seed_pairs]
+    if version == SHUFFLE_V1:
+        return np.array([_shuffle_v1(d) for d in digests], dtype=np.uint8).reshape(len(digests), NUM_CARDS)
+    if version == SHUFFLE_V2:
+        return _shuffle_v2_batch(digests)
+    raise ValueError(f"Unknown shuffle version: {version}")
+
+
+def shuffle_deck(server_seed: str, client_seed: str, version: int = CURRENT_SHUFFLE_VERSION) -> List[int]:
+    digest = seed_hash(server_seed, client_seed)
+    if version == SHUFFLE_V1:
+        return _shuffle_v1(digest)
+    if version == SHUFFLE_V2:
+        return _shuffle_v2(digest)
+    raise ValueError(f"Unknown shuffle version: {version}")
+
+
 class CommitRevealDeck:
-    def __init__(self):
+    def __init__(self, shuffle_version: int = CURRENT_SHUFFLE_VERSION, seed_chain=None):
+        if shuffle_version not in SHUFFLE_VERSIONS:
+            raise ValueError(f"Unknown shuffle version: {shuffle_version}")
+        self.shuffle_version = shuffle_version
+        self.seed_chain = seed_chain
+        self.chain_proof = None
         self.server_seed = None
         self.client_seed = None
         self.deck = []
@@ -64,7 +215,11 @@ class CommitRevealDeck:
         self.is_revealed = False
         
     def generate_commitment(self) -> str:
-        self.server_seed = secrets.token_hex(32)
+        if self.seed_chain is not None:
+            self.server_seed, self.chain_proof = self.seed_chain.next_seed()
+        else:
+            self.server_seed = secrets.token_hex(32)
+            self.chain_proof = None
         self.commitment = hashlib.sha256(self.server_seed.encode()).hexdigest()
         self.is_committed = True
         self.is_revealed = False
@@ -82,15 +237,7 @@ class CommitRevealDeck:
             raise ValueError("Already revealed for this hand")
         
         self.client_seed = client_seed
-        combined = self.server_seed + client_seed
-        seed_hash = hashlib.sha256(combined.encode()).digest()
-        seed_int = int.from_bytes(seed_hash[:4], 'big')
-        
-        self.deck = [Card(r, s) for r in RANKS for s in SUITS]
-        
-        import random
-        random.seed(seed_int)
-        random.shuffle(self.deck)
+        self.deck = shuffle_deck(self.server_seed, client_seed, self.shuffle_version)
         
         self.deck_index = 0
         self.is_revealed = True
@@ -102,6 +249,7 @@ class CommitRevealDeck:
     
     def reset(self):
         self.server_seed = None
+        self.chain_proof = None
         self.client_seed = None
         self.deck = []
         self.deck_index = 0
@@ -112,7 +260,7 @@ class CommitRevealDeck:
     def deal_card(self) -> Optional[Card]:
         if self.deck_index >= len(self.deck):
             return None
-        card = self.deck[self.deck_index]
+        card = CARDS[self.deck[self.deck_index]]
         self.deck_index += 1
         return card
     
@@ -124,13 +272,73 @@ class CommitRevealDeck:
                 cards.append(card)
         return cards
     
+    @staticmethod
+    def shuffle_batch(server_seeds: List[str], client_seeds: List[str],
+                      shuffle_version: int = CURRENT_SHUFFLE_VERSION) -> np.ndarray:
+        if len(server_seeds) != len(client_seeds):
+            raise ValueError("Need one client seed per server seed")
+        return shuffle_decks(list(zip(server_seeds, client_seeds)), shuffle_version)
+    
     def verify_fairness(self) -> Dict:
-        return {
+        proof = {
             'server_seed': self.server_seed,
             'client_seed': self.client_seed,
             'commitment': self.commitment,
-            'combined_hash': hashlib.sha256((self.server_seed + self.client_seed).encode()).hexdigest()
+            'combined_hash': hashlib.sha256((self.server_seed + self.client_seed).encode()).hexdigest(),
+            'shuffle_version': self.shuffle_version
         }
+        if self.chain_proof:
+            proof.update(self.chain_proof)
+        return proof
+
+
+class EvaluationCache:
+    def __init__(self, maxsize: int = 100000):
+        if maxsize <= 0:
+            raise ValueError("Cache size must be positive")
+        self.maxsize = maxsize
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def get(self, mask: int) -> Optional[int]:
+        with self._lock:
+            strength = self._entries.get(mask)
+            if strength is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(mask)
+            self.hits += 1
+            return strength
+    
+    def put(self, mask: int, strength: int):
+        with self._lock:
+            self._entries[mask] = strength
+            self._entries.move_to_end(mask)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+    
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
 
 
 class HandEvaluator:
@@ -152,103 +360,183 @@ class HandEvaluator:
         if len(cards) < 5:
             return (0, 'high_card', [RANK_VALUES[cards[0].rank]] if cards else [0])
         
-        best_hand = None
-        best_rank = -1
-        best_name = 'high_card'
-        best_kickers = []
-        
-        from itertools import combinations
-        for combo in combinations(cards, 5):
-            hand_rank, hand_name, kickers = HandEvaluator._evaluate_five_cards(list(combo))
-            if hand_rank > best_rank or (hand_rank == best_rank and kickers > best_kickers):
-                best_rank = hand_rank
-                best_name = hand_name
-                best_kickers = kickers
-        
-        return (best_rank, best_name, best_kickers)
+        return unpack_strength(HandEvaluator.evaluate_strength(cards))
+    
+    _cache: Optional[EvaluationCache] = None
     
     @staticmethod
-    def _evaluate_five_cards(cards: List[Card]) -> Tuple[int, str, List[int]]:
-        ranks = sorted([RANK_VALUES[c.rank] for c in cards], reverse=True)
-        suits = [c.suit for c in cards]
-        
-        is_flush = len(set(suits)) == 1
-        is_straight = HandEvaluator._is_straight(ranks)
-        
-        if is_straight and ranks == [14, 5, 4, 3, 2]:
-            ranks = [5, 4, 3, 2, 1]
-        
-        rank_counts = {}
-        for r in ranks:
-            rank_counts[r] = rank_counts.get(r, 0) + 1
-        
-        counts = sorted(rank_counts.values(), reverse=True)
-        sorted_ranks = sorted(rank_counts.keys(), key=lambda x: (rank_counts[x], x), reverse=True)
-        
-        if is_straight and is_flush:
-            if ranks[0] == 14 and ranks[1] == 13:
-                return (9, 'royal_flush', ranks)
-            return (8, 'straight_flush', ranks)
-        
-        if counts == [4, 1]:
-            return (7, 'four_of_a_kind', sorted_ranks)
-        
-        if counts == [3, 2]:
-            return (6, 'full_house', sorted_ranks)
-        
-        if is_flush:
-            return (5, 'flush', ranks)
-        
-        if is_straight:
-            return (4, 'straight', ranks)
-        
-        if counts == [3, 1, 1]:
-            return (3, 'three_of_a_kind', sorted_ranks)
-        
-        if counts == [2, 2, 1]:
-            return (2, 'two_pair', sorted_ranks)
-        
-        if counts == [2, 1, 1, 1]:
-            return (1, 'pair', sorted_ranks)
-        
-        return (0, 'high_card', ranks)
+    def enable_cache(maxsize: int = 100000) -> EvaluationCache:
+        HandEvaluator._cache = EvaluationCache(maxsize)
+        return HandEvaluator._cache
     
     @staticmethod
-    def _is_straight(ranks: List[int]) -> bool:
-        unique = sorted(set(ranks), reverse=True)
-        if len(unique) != 5:
-            return False
-        
-        if unique[0] - unique[4] == 4:
-            return True
-        
-        if unique == [14, 5, 4, 3, 2]:
-            return True
-        
-        return False
+    def disable_cache():
+        HandEvaluator._cache = None
+    
+    @staticmethod
+    def cache_stats() -> Optional[Dict]:
+        cache = HandEvaluator._cache
+        return cache.stats() if cache is not None else None
+    
+    @staticmethod
+    def evaluate_strength(cards: List[Card]) -> int:
+        cache = HandEvaluator._cache
+        if cache is None:
+            return HandEvaluator._strength_from_ids([c.id for c in cards])
+        
+        mask = 0
+        for c in cards:
+            mask |= c.mask
+        strength = cache.get(mask)
+        if strength is None:
+            strength = HandEvaluator._strength_from_ids([c.id for c in cards])
+            cache.put(mask, strength)
+        return strength
+    
+    @staticmethod
+    def _strength_from_ids(card_ids: List[int]) -> int:
+        if len(card_ids) > 7:
+            return max(HandEvaluator._lookup_strength(combo) for combo in combinations(card_ids, 5))
+        return HandEvaluator._lookup_strength(card_ids)
+    
+    @staticmethod
+    def category(strength: int) -> int:
+        return strength >> CATEGORY_SHIFT
+    
+    @staticmethod
+    def category_name(strength: int) -> str:
+        return HAND_CATEGORIES[strength >> CATEGORY_SHIFT]
+    
+    @staticmethod
+    def _lookup_strength(card_ids: List[int]) -> int:
+        rank_key = 0
+        suit_masks = [0, 0, 0, 0]
+        for i in card_ids:
+            rank_key += CARD_RANK_WEIGHTS[i]
+            suit_masks[i & 3] |= CARD_RANK_BITS[i]
+        
+        for mask in suit_masks:
+            flush_strength = FLUSH_TABLE[mask]
+            if flush_strength:
+                return flush_strength
+        
+        return RANK_TABLE[rank_key]
+    
+    @staticmethod
+    def rank_hands(board: List[Card], holes: List[List[Card]]) -> List[Tuple[int, List[int]]]:
+        board_state = HandState([c.id for c in board])
+        cache = HandEvaluator._cache
+        strengths = []
+        for hole in holes:
+            hole_ids = [c.id for c in hole]
+            if cache is None:
+                strengths.append(board_state.strength_with(hole_ids))
+                continue
+            
+            mask = board_state.card_mask
+            for c in hole:
+                mask |= c.mask
+            strength = cache.get(mask)
+            if strength is None:
+                strength = board_state.strength_with(hole_ids)
+                cache.put(mask, strength)
+            strengths.append(strength)
+        
+        return HandEvaluator._group_by_strength(strengths)
+    
+    @staticmethod
+    def rank_omaha_hands(board: List[Card], holes: List[List[Card]]) -> List[Tuple[int, List[int]]]:
+        return HandEvaluator._group_by_strength([HandEvaluator.evaluate_omaha(hole, board) for hole in holes])
+    
+    @staticmethod
+    def _group_by_strength(strengths: List[int]) -> List[Tuple[int, List[int]]]:
+        groups = []
+        for i in sorted(range(len(strengths)), key=lambda i: strengths[i], reverse=True):
+            if groups and groups[-1][0] == strengths[i]:
+                groups[-1][1].append(i)
+            else:
+                groups.append((strengths[i], [i]))
+        return groups
+    
+    @staticmethod
+    def evaluate_omaha(hole: List[Card], board: List[Card]) -> int:
+        hole_ids = [c.id for c in hole]
+        board_ids = [c.id for c in board]
+        if len(hole_ids) != 4 or not 3 <= len(board_ids) <= 5:
+            raise ValueError("Omaha hands need four hole cards and three to five board cards")
+        
+        # Rank keys of equal-rank pairs and triples coincide, so sets skip repeated lookups.
+        pair_keys = {CARD_RANK_WEIGHTS[a] + CARD_RANK_WEIGHTS[b] for a, b in combinations(hole_ids, 2)}
+        triple_keys = {CARD_RANK_WEIGHTS[a] + CARD_RANK_WEIGHTS[b] + CARD_RANK_WEIGHTS[c]
+                       for a, b, c in combinations(board_ids, 3)}
+        best = max(RANK_TABLE[p + t] for p in pair_keys for t in triple_keys)
+        
+        # A flush needs three board cards and two hole cards of the same suit.
+        for suit in range(4):
+            board_bits = [CARD_RANK_BITS[c] for c in board_ids if c & 3 == suit]
+            if len(board_bits) < 3:
+                continue
+            hole_bits = [CARD_RANK_BITS[c] for c in hole_ids if c & 3 == suit]
+            for a, b in combinations(hole_bits, 2):
+                for x, y, z in combinations(board_bits, 3):
+                    best = max(best, FLUSH_TABLE[a | b | x | y | z])
+        return best
+    
+    @staticmethod
+    def evaluate_omaha_batch(holes: np.ndarray, boards: np.ndarray) -> np.ndarray:
+        holes = np.asarray(holes, dtype=np.int64)
+        boards = np.asarray(boards, dtype=np.int64)
+        if holes.ndim != 2 or holes.shape[1] != 4 or boards.shape != (len(holes), 5):
+            raise ValueError("evaluate_omaha_batch expects (N, 4) hole and (N, 5) board arrays")
+        
+        n = len(holes)
+        pairs = holes[:, OMAHA_HOLE_PAIRS]
+        triples = boards[:, OMAHA_BOARD_TRIPLES]
+        combos = np.concatenate([
+            np.broadcast_to(pairs[:, :, None, :], (n, len(OMAHA_HOLE_PAIRS), len(OMAHA_BOARD_TRIPLES), 2)),
+            np.broadcast_to(triples[:, None, :, :], (n, len(OMAHA_HOLE_PAIRS), len(OMAHA_BOARD_TRIPLES), 3))
+        ], axis=3)
+        return HandEvaluator.evaluate_batch(combos.reshape(-1, 5)).reshape(n, -1).max(axis=1)
+    
+    @staticmethod
+    def evaluate_batch(cards: np.ndarray) -> np.ndarray:
+        cards = np.asarray(cards, dtype=np.int64)
+        if cards.ndim != 2 or not 5 <= cards.shape[1] <= 7:
+            raise ValueError("evaluate_batch expects an (N, 5..7) array of card ids")
+        
+        rank_keys = CARD_RANK_WEIGHTS_ARRAY[cards].sum(axis=1)
+        strengths = RANK_TABLE_VALUES[np.searchsorted(RANK_TABLE_KEYS, rank_keys)]
+        
+        suits = cards & 3
+        rank_bits = CARD_RANK_BITS_ARRAY[cards]
+        for suit in range(4):
+            # Rank bits within one suit are distinct, so the sum is their OR.
+            suit_masks = np.where(suits == suit, rank_bits, 0).sum(axis=1)
+            strengths = np.maximum(strengths, FLUSH_TABLE_ARRAY[suit_masks])
+        
+        return strengths
     
     @staticmethod
     def compare_hands(hand1: List[Card], hand2: List[Card]) -> int:
-        rank1, name1, kickers1 = HandEvaluator.evaluate_hand(hand1)
-        rank2, name2, kickers2 = HandEvaluator.evaluate_hand(hand2)
-        
-        if rank1 != rank2:
-            return 1 if rank1 > rank2 else -1
-        
-        for k1, k2 in zip(kickers1, kickers2):
-            if k1 != k2:
-                return 1 if k1 > k2 else -1
-        
-        return 0
+        strength1 = HandEvaluator.evaluate_strength(hand1)
+        strength2 = HandEvaluator.evaluate_strength(hand2)
+        return (strength1 > strength2) - (strength1 < strength2)
 
 
 class PokerGame:
     STAGES = ['preflop', 'flop', 'turn', 'river', 'showdown']
+    HOLE_CARDS = {'holdem': 2, 'omaha': 4}
     
-    def __init__(self, session_id: str):
+    def __init__(self, session_id: str, variant: str = 'holdem', seed_chain=None):
+        if variant not in self.HOLE_CARDS:
+            raise ValueError(f"Unknown game variant: {variant}")
         self.session_id = session_id
-        self.deck = CommitRevealDeck()
+        self.variant = variant
+        self.deck = CommitRevealDeck(seed_chain=seed_chain)
         self.players: List[Player] = []
+        self.seats: Dict[str, int] = {}
+        self.folded_count = 0
+        self.all_in_count = 0
         self.community_cards: List[Card] = []
         self.pot = 0.0
         self.current_bet = 0.0
@@ -262,14 +550,37 @@ class PokerGame:
         
     def add_player(self, player_id: str, name: str, chips: float = 1000.0) -> Player:
         player = Player(id=player_id, name=name, chips=chips)
+        # A seat taken mid-hand has no cards, so it sits out until the next deal.
+        if self.hand_in_progress:
+            player.is_folded = True
+            self.folded_count += 1
+        self.seats.setdefault(player_id, len(self.players))
         self.players.append(player)
         return player
     
+    @property
+    def hand_in_progress(self) -> bool:
+        return self.stage != 'showdown' and any(p.hole_cards for p in self.players)
+    
+    def get_player(self, player_id: str) -> Optional[Player]:
+        seat = self.seats.get(player_id)
+        return self.players[seat] if seat is not None else None
+    
+    # folded_count and all_in_count are kept up to date by deal_hand, _make_bet and
+    # folds; all_in_count only covers players who have not folded.
+    @property
+    def active_count(self) -> int:
+        return len(self.players) - self.folded_count
+    
     def request_commitment(self) -> str:
         self.deck.reset()
         return self.deck.generate_commitment()
     
     def start_hand(self, client_seed: str) -> Dict:
+        self.deal_hand(client_seed)
+        return self.get_state()
+    
+    def deal_hand(self, client_seed: str):
         if self.deck.is_revealed:
             self.deck.reset()
             self.deck.generate_commitment()
@@ -284,6 +595,8 @@ class PokerGame:
         self.current_bet = 0.0
         self.stage = 'preflop'
         self.actions_this_round = 0
+        self.folded_count = 0
+        self.all_in_count = 0
         
         for player in self.players:
             player.hole_cards = []
@@ -292,11 +605,12 @@ class PokerGame:
             player.is_all_in = False
         
         for player in self.players:
-            player.hole_cards = self.deck.deal_cards(2)
+            player.hole_cards = self.deck.deal_cards(self.HOLE_CARDS[self.variant])
+            player.hand_state.reset()
+            if self.variant == 'holdem':
+                player.hand_state.add_cards([c.id for c in player.hole_cards])
         
         self._post_blinds()
-        
-        return self.get_state()
     
     def _post_blinds(self):
         if len(self.players) >= 2:
@@ -315,27 +629,35 @@ class PokerGame:
         player.chips -= actual_bet
         player.current_bet += actual_bet
         self.pot += actual_bet
-        if player.chips == 0:
+        if player.chips == 0 and not player.is_all_in:
             player.is_all_in = True
+            self.all_in_count += 1
     
     def process_action(self, player_id: str, action: str, amount: float = 0) -> Dict:
-        player = None
-        player_index = -1
-        for i, p in enumerate(self.players):
-            if p.id == player_id:
-                player = p
-                player_index = i
-                break
-        
-        if not player or player.is_folded:
+        player_index = self.seats.get(player_id)
+        if player_index is None or self.players[player_index].is_folded:
             return {'error': 'Invalid player or already folded'}
         
+        error = self.apply_action(player_index, action, amount)
+        if error:
+            return {'error': error}
+        
+        return self.get_state()
+    
+    def apply_action(self, player_index: int, action: str, amount: float = 0) -> Optional[str]:
+        player = self.players[player_index]
+        if player.is_folded:
+            return 'Invalid player or already folded'
+        
         if action == 'fold':
             player.is_folded = True
+            self.folded_count += 1
+            if player.is_all_in:
+                self.all_in_count -= 1
         
         elif action == 'check':
             if player.current_bet < self.current_bet:
-                return {'error': 'Cannot check, must call or raise'}
+                return 'Cannot check, must call or raise'
         
         elif action == 'call':
             call_amount = self.current_bet - player.current_bet
@@ -343,23 +665,47 @@ class PokerGame:
         
         elif action == 'raise':
             call_amount = self.current_bet - player.current_bet
+            if self.variant == 'omaha':
+                amount = min(amount, self.pot_limit_raise(call_amount))
             total_bet = call_amount + amount
             self._make_bet(player_index, total_bet)
             self.current_bet = player.current_bet
             self.last_raise_amount = amount
         
         elif action == 'all_in':
-            self._make_bet(player_index, player.chips)
+            all_in_amount = player.chips
+            if self.variant == 'omaha':
+                call_amount = self.current_bet - player.current_bet
+                all_in_amount = min(all_in_amount, call_amount + self.pot_limit_raise(call_amount))
+            self._make_bet(player_index, all_in_amount)
             if player.current_bet > self.current_bet:
                 self.current_bet = player.current_bet
         
         self.actions_this_round += 1
         self._move_to_next_player()
         self._advance_game()
-        
-        return self.get_state()
+        return None
+    
+    def pot_limit_raise(self, call_amount: float) -> float:
+        # Pot-limit: the largest raise is the pot after the player has called.
+        return self.pot + call_amount
+    
+    def hand_strength(self, player: Player) -> int:
+        if len(player.hole_cards) != self.HOLE_CARDS[self.variant]:
+            return 0
+        if self.variant == 'holdem':
+            return player.hand_state.strength
+        if len(self.community_cards) < 3:
+            return 0
+        return HandEvaluator.evaluate_omaha(player.hole_cards, self.community_cards)
+    
+    def made_hand(self, player: Player) -> str:
+        return HandEvaluator.category_name(self.hand_strength(player))
     
     def _move_to_next_player(self):
+        if self.folded_count + self.all_in_count >= len(self.players):
+            self.current_player_index = 0
+            return
         for _ in range(len(self.players)):
             self.current_player_index = (self.current_player_index + 1) % len(self.players)
             next_player = self.players[self.current_player_index]
@@ -368,16 +714,16 @@ class PokerGame:
         self.current_player_index = 0
     
     def _advance_game(self):
-        active_players = [p for p in self.players if not p.is_folded]
+        active_count = self.active_count
         
-        if len(active_players) == 1:
+        if active_count == 1:
             self.stage = 'showdown'
             return
         
-        betting_complete = all(
+        betting_complete = self.actions_this_round >= active_count and all(
             p.current_bet == self.current_bet or p.is_all_in or p.is_folded
             for p in self.players
-        ) and self.actions_this_round >= len([p for p in self.players if not p.is_folded])
+        )
         
         if betting_complete:
             self._next_stage()
@@ -399,20 +745,55 @@ class PokerGame:
             self.current_bet = 0
             self.actions_this_round = 0
             
+            dealt = []
             if self.stage == 'flop':
-                self.community_cards.extend(self.deck.deal_cards(3))
+                dealt = self.deck.deal_cards(3)
             elif self.stage == 'turn':
-                self.community_cards.extend(self.deck.deal_cards(1))
+                dealt = self.deck.deal_cards(1)
             elif self.stage == 'river':
-                self.community_cards.extend(self.deck.deal_cards(1))
+                dealt = self.deck.deal_cards(1)
             elif self.stage == 'showdown':
                 pass
             
+            self.community_cards.extend(dealt)
+            if self.variant == 'holdem':
+                for card in dealt:
+                    for player in self.players:
+                        player.hand_state.add_card(card.id)
+            
             if self.stage != 'showdown':
                 self._reset_action_to_first_player()
     
+    def award_pot(self, whole_chips: bool = False) -> Tuple[List[Player], List[Player], List[Tuple[int, List[int]]]]:
+        active_players = [p for p in self.players
+                          if not p.is_folded and len(p.hole_cards) == self.HOLE_CARDS[self.variant]]
+        
+        if len(active_players) <= 1:
+            if active_players:
+                active_players[0].chips += self.pot
+            return active_players, active_players, []
+        
+        holes = [p.hole_cards for p in active_players]
+        if self.variant == 'omaha':
+            groups = HandEvaluator.rank_omaha_hands(self.community_cards, holes)
+        else:
+            groups = HandEvaluator.rank_hands(self.community_cards, holes)
+        
+        winners = [active_players[i] for i in groups[0][1]]
+        if whole_chips:
+            # Split pots pay whole chips; the odd chips go to the first winner in seat order.
+            share = self.pot // len(winners)
+            for winner in winners:
+                winner.chips += share
+            winners[0].chips += self.pot - share * len(winners)
+        else:
+            share = self.pot / len(winners)
+            for winner in winners:
+                winner.chips += share
+        return winners, active_players, groups
+    
     def determine_winner(self) -> Dict:
-        active_players = [p for p in self.players if not p.is_folded]
+        winners, active_players, groups = self.award_pot()
         
         if len(active_players) == 0:
             return {
@@ -422,45 +803,32 @@ class PokerGame:
             }
         
         if len(active_players) == 1:
-            winner = active_players[0]
-            winner.chips += self.pot
             return {
-                'winner': winner.to_dict(),
+                'winner': winners[0].to_dict(),
                 'hand_rank': 'opponent folded',
                 'pot': self.pot
             }
         
-        best_player = None
-        best_rank = -1
-        best_name = ''
-        best_kickers = []
-        
-        for player in active_players:
-            all_cards = player.hole_cards + self.community_cards
-            rank, name, kickers = HandEvaluator.evaluate_hand(all_cards)
-            
-            if rank > best_rank or (rank == best_rank and kickers > best_kickers):
-                best_player = player
-                best_rank = rank
-                best_name = name
-                best_kickers = kickers
-        
-        if best_player is None:
-            best_player = active_players[0]
-            best_name = 'high card'
-        
-        best_player.chips += self.pot
-        
         return {
-            'winner': best_player.to_dict(),
-            'hand_rank': best_name,
+            'winner': winners[0].to_dict(),
+            'winners': [w.to_dict() for w in winners],
+            'hand_rank': HandEvaluator.category_name(groups[0][0]),
             'pot': self.pot,
+            'split_pot': len(winners) > 1,
+            'ranking': [
+                {
+                    'player_ids': [active_players[i].id for i in indices],
+                    'hand_rank': HandEvaluator.category_name(strength)
+                }
+                for strength, indices in groups
+            ],
             'fairness_proof': self.deck.verify_fairness()
         }
     
     def get_state(self) -> Dict:
         return {
             'session_id': self.session_id,
+            'variant': self.variant,
             'stage': self.stage,
             'pot': self.pot,
             'current_bet': self.current_bet,
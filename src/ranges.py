@@ -0,0 +1,203 @@
+from itertools import combinations
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.cards import NUM_CARDS, RANKS, card_ids
+from src.equity import EquityResult, Z_95, remaining_cards
+from src.poker_engine import HandEvaluator
+
+
+NUM_COMBOS = 1326
+DEFAULT_MAX_RUNOUTS = 1200
+
+DEFAULT_OPPONENT_RANGE = (
+    "22+, A2s+, K8s+, Q9s+, J9s+, T8s+, 97s+, 86s+, 75s+, 65s, 54s, "
+    "A8o+, KTo+, QTo+, JTo"
+)
+
+# Combo index of cards a < b is the colex rank b * (b - 1) / 2 + a.
+COMBO_CARDS = np.array([(a, b) for b in range(NUM_CARDS) for a in range(b)], dtype=np.int64)
+
+COMBO_MEMBERSHIP = np.zeros((NUM_COMBOS, NUM_CARDS), dtype=np.float64)
+COMBO_MEMBERSHIP[np.arange(NUM_COMBOS), COMBO_CARDS[:, 0]] = 1.0
+COMBO_MEMBERSHIP[np.arange(NUM_COMBOS), COMBO_CARDS[:, 1]] = 1.0
+
+
+def combo_index(a: int, b: int) -> int:
+    if a > b:
+        a, b = b, a
+    return b * (b - 1) // 2 + a
+
+
+def _rank_index(r: str) -> int:
+    return RANKS.index(r.upper())
+
+
+def _class_combos(high: int, low: int, suited: Optional[bool]) -> List[int]:
+    combos = []
+    for s1 in range(4):
+        for s2 in range(4):
+            a, b = high * 4 + s1, low * 4 + s2
+            if a == b:
+                continue
+            if high == low and s1 > s2:
+                continue
+            if suited is True and s1 != s2:
+                continue
+            if suited is False and s1 == s2:
+                continue
+            combos.append(combo_index(a, b))
+    return combos
+
+
+def _parse_token(token: str) -> List[int]:
+    plus = token.endswith('+')
+    token = token.rstrip('+')
+    if len(token) not in (2, 3):
+        raise ValueError(f"Invalid range token: {token}")
+    high, low = _rank_index(token[0]), _rank_index(token[1])
+    suited = {'s': True, 'o': False}.get(token[2].lower()) if len(token) == 3 else None
+    if high < low:
+        high, low = low, high
+
+    if high == low:
+        pairs = range(high, 13) if plus else [high]
+        return [c for p in pairs for c in _class_combos(p, p, None)]
+
+    kickers = range(low, high) if plus else [low]
+    return [c for k in kickers for c in _class_combos(high, k, suited)]
+
+
+class Range:
+    def __init__(self, weights: Optional[np.ndarray] = None):
+        if weights is None:
+            weights = np.zeros(NUM_COMBOS)
+        weights = np.asarray(weights, dtype=np.float64)
+        if weights.shape != (NUM_COMBOS,):
+            raise ValueError(f"Range weights must have shape ({NUM_COMBOS},)")
+        self.weights = weights
+
+    @classmethod
+    def uniform(cls) -> 'Range':
+        return cls(np.ones(NUM_COMBOS))
+
+    @classmethod
+    def from_combos(cls, combos: Iterable[Sequence], weight: float = 1.0) -> 'Range':
+        weights = np.zeros(NUM_COMBOS)
+        for combo in combos:
+            a, b = card_ids(combo)
+            weights[combo_index(a, b)] = weight
+        return cls(weights)
+
+    @classmethod
+    def parse(cls, notation: str) -> 'Range':
+        weights = np.zeros(NUM_COMBOS)
+        for token in notation.replace(' ', '').split(','):
+            if token:
+                weights[_parse_token(token)] = 1.0
+        return cls(weights)
+
+    def without_cards(self, dead: Iterable[int]) -> 'Range':
+        dead = list(dead)
+        if not dead:
+            return Range(self.weights.copy())
+        blocked = COMBO_MEMBERSHIP[:, dead].any(axis=1)
+        return Range(np.where(blocked, 0.0, self.weights))
+
+    def num_combos(self) -> int:
+        return int(np.count_nonzero(self.weights))
+
+    def total_weight(self) -> float:
+        return float(self.weights.sum())
+
+
+def _board_sums(hero_w: np.ndarray, villain_w: np.ndarray, board: Sequence[int]) -> Tuple[float, float]:
+    alive = ~COMBO_MEMBERSHIP[:, list(board)].any(axis=1)
+    hero_w = hero_w * alive
+    villain_w = villain_w * alive
+    if not hero_w.any() or not villain_w.any():
+        return 0.0, 0.0
+
+    live_combos = COMBO_CARDS[alive]
+    strengths = np.full(NUM_COMBOS, -1, dtype=np.int64)
+    strengths[alive] = HandEvaluator.evaluate_batch(
+        np.concatenate([live_combos, np.broadcast_to(np.array(board, dtype=np.int64), (len(live_combos), 5))], axis=1)
+    )
+
+    # One ranking per board: cumulative villain weight below and up to each strength.
+    order = np.argsort(strengths, kind='stable')
+    sorted_strengths = strengths[order]
+    lower = np.searchsorted(sorted_strengths, strengths, side='left')
+    upper = np.searchsorted(sorted_strengths, strengths, side='right')
+
+    cum = np.concatenate([[0.0], np.cumsum(villain_w[order])])
+    card_weights = COMBO_MEMBERSHIP[order] * villain_w[order][:, None]
+    card_cum = np.concatenate([np.zeros((1, NUM_CARDS)), np.cumsum(card_weights, axis=0)])
+    card_totals = card_cum[-1]
+
+    # Card removal: drop villain combos sharing either hero card (inclusion-exclusion
+    # adds back the identical combo, which shares both).
+    a, b = COMBO_CARDS[:, 0], COMBO_CARDS[:, 1]
+    less = cum[lower] - card_cum[lower, a] - card_cum[lower, b]
+    less_equal = cum[upper] - card_cum[upper, a] - card_cum[upper, b] + villain_w
+    total = cum[-1] - card_totals[a] - card_totals[b] + villain_w
+
+    won = less + 0.5 * (less_equal - less)
+    return float(np.dot(hero_w, won)), float(np.dot(hero_w, total))
+
+
+def range_vs_range_equity(hero: Range, villain: Range, community_cards: Sequence = (),
+                          max_runouts: int = DEFAULT_MAX_RUNOUTS,
+                          rng: Optional[np.random.Generator] = None) -> EquityResult:
+    board = card_ids(community_cards)
+    if len(board) > 5:
+        raise ValueError("Board cannot have more than five cards")
+    board_needed = 5 - len(board)
+    deck = remaining_cards(board).tolist()
+
+    num_runouts = 1
+    for i in range(board_needed):
+        num_runouts = num_runouts * (len(deck) - i) // (i + 1)
+
+    if num_runouts <= max_runouts:
+        runouts = list(combinations(deck, board_needed))
+        method = 'exact'
+    else:
+        rng = rng or np.random.default_rng()
+        runouts = [tuple(rng.choice(deck, board_needed, replace=False)) for _ in range(max_runouts)]
+        method = 'monte_carlo'
+
+    won = np.zeros(len(runouts))
+    total = np.zeros(len(runouts))
+    for i, runout in enumerate(runouts):
+        won[i], total[i] = _board_sums(hero.weights, villain.weights, board + list(runout))
+
+    if total.sum() == 0:
+        raise ValueError("Ranges have no compatible combos on this board")
+
+    equity = float(won.sum() / total.sum())
+    std_error = 0.0
+    if method == 'monte_carlo':
+        # Ratio-estimator standard error over the sampled runouts.
+        residuals = won - equity * total
+        std_error = float(np.sqrt(np.square(residuals).sum()) / total.sum())
+
+    return EquityResult(
+        equity=equity,
+        std_error=std_error,
+        ci_low=max(0.0, equity - Z_95 * std_error),
+        ci_high=min(1.0, equity + Z_95 * std_error),
+        samples=len(runouts),
+        method=method
+    )
+
+
+def equity_vs_range(hole_cards: Sequence, community_cards: Sequence = (),
+                    villain: Optional[Range] = None,
+                    max_runouts: int = 300) -> EquityResult:
+    villain = villain or _default_opponent_range
+    return range_vs_range_equity(Range.from_combos([hole_cards]), villain, community_cards, max_runouts)
+
+
+_default_opponent_range = Range.parse(DEFAULT_OPPONENT_RANGE)
@@ -0,0 +1,107 @@
+import hashlib
+import secrets
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+DEFAULT_CHAIN_LENGTH = 1000
+
+
+def hash_seed(seed: str) -> str:
+    return hashlib.sha256(seed.encode()).hexdigest()
+
+
+def verify_chain(server_seed: str, distance: int, terminal: str) -> bool:
+    # A seed `distance` links below the terminal hashes forward to it.
+    value = server_seed
+    for _ in range(distance):
+        value = hash_seed(value)
+    return value == terminal
+
+
+# Seeds x_0..x_N with x_{i+1} = sha256(x_i) and only the terminal x_N published.
+# Hands consume the chain backwards, so each server seed's commitment is the
+# previous hand's seed (the terminal for the first hand) and revealing a seed
+# gives nothing away about the ones still to come.
+class HashChain:
+    def __init__(self, length: int = DEFAULT_CHAIN_LENGTH, root_seed: Optional[str] = None):
+        if length < 1:
+            raise ValueError("Chain length must be positive")
+        self.chain_id = secrets.token_hex(8)
+        self.length = length
+        self._seeds: List[str] = [root_seed or secrets.token_hex(32)]
+        for _ in range(length):
+            self._seeds.append(hash_seed(self._seeds[-1]))
+        self.terminal = self._seeds[-1]
+        self.position = length
+
+    @property
+    def remaining(self) -> int:
+        return self.position
+
+    def next_seed(self) -> Tuple[str, int]:
+        if self.position == 0:
+            raise ValueError("Hash chain exhausted")
+        self.position -= 1
+        return self._seeds[self.position], self.length - self.position
+
+
+# Every seed is the preimage of the one handed out before it, so a chain must
+# never be shared between tables: a later hand revealed at one table would give
+# away the seed of a hand still being played at another. The manager hands each
+# table its own chain, which the table consumes strictly in order.
+class SeedChainManager:
+    def __init__(self, length: int = DEFAULT_CHAIN_LENGTH,
+                 on_new_chain: Optional[Callable[[HashChain], None]] = None):
+        self.length = length
+        self.on_new_chain = on_new_chain
+        self._lock = threading.Lock()
+        self.tables = 0
+        self.chains_started = 0
+
+    def table_chain(self) -> 'TableSeedChain':
+        with self._lock:
+            self.tables += 1
+        return TableSeedChain(self)
+
+    def _new_chain(self) -> HashChain:
+        chain = HashChain(self.length)
+        with self._lock:
+            self.chains_started += 1
+        if self.on_new_chain is not None:
+            try:
+                self.on_new_chain(chain)
+            except Exception as e:
+                print(f"Could not publish seed chain {chain.chain_id}: {e}")
+        return chain
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'length': self.length,
+                'tables': self.tables,
+                'chains_started': self.chains_started
+            }
+
+
+class TableSeedChain:
+    def __init__(self, manager: SeedChainManager):
+        self.manager = manager
+        self._lock = threading.Lock()
+        self._chain: Optional[HashChain] = None
+
+    @property
+    def chain_id(self) -> Optional[str]:
+        return self._chain.chain_id if self._chain else None
+
+    def next_seed(self) -> Tuple[str, Dict]:
+        with self._lock:
+            if self._chain is None or self._chain.remaining == 0:
+                self._chain = self.manager._new_chain()
+            chain = self._chain
+            seed, distance = chain.next_seed()
+        return seed, {
+            'chain_id': chain.chain_id,
+            'chain_terminal': chain.terminal,
+            'chain_distance': distance
+        }
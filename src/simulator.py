@@ -0,0 +1,268 @@
+import argparse
+import hashlib
+import os
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.equity import Z_95
+from src.poker_engine import PokerGame
+
+
+CHUNK_HANDS = 10000
+DEFAULT_STACK = 1000
+DEFAULT_SMALL_BLIND = 5
+DEFAULT_BIG_BLIND = 10
+MAX_ACTIONS_PER_HAND = 200
+
+
+class Agent(ABC):
+    name = 'agent'
+
+    @abstractmethod
+    def act(self, game: PokerGame, seat: int, rng: np.random.Generator) -> Tuple[str, int]:
+        pass
+
+
+class RandomAgent(Agent):
+    name = 'random'
+
+    def act(self, game: PokerGame, seat: int, rng: np.random.Generator) -> Tuple[str, int]:
+        player = game.players[seat]
+        facing = game.current_bet - player.current_bet
+        actions = ['fold', 'call', 'raise'] if facing > 0 else ['check', 'raise']
+        action = actions[rng.integers(len(actions))]
+        if action == 'raise':
+            return action, int(rng.integers(game.big_blind, max(game.big_blind, int(game.pot)) + 1))
+        return action, 0
+
+
+class CallingStationAgent(Agent):
+    name = 'calling_station'
+
+    def act(self, game: PokerGame, seat: int, rng: np.random.Generator) -> Tuple[str, int]:
+        player = game.players[seat]
+        return ('call' if game.current_bet > player.current_bet else 'check'), 0
+
+
+class CFRPlayerAgent(Agent):
+    name = 'cfr'
+
+    # Same action choice and sizing as the live AI opponent in app.py.
+    ACTION_MAP = {
+        'check': 'check',
+        'call': 'call',
+        'fold': 'fold',
+        'raise_small': 'raise',
+        'raise_big': 'raise',
+        'raise_half': 'raise',
+        'raise_pot': 'raise',
+        'all_in': 'all_in'
+    }
+
+    def __init__(self, load_from_db: bool = True):
+        from src.cfr_strategy import CFRAgent
+        self.agent = CFRAgent(load_from_db=load_from_db)
+
+    def act(self, game: PokerGame, seat: int, rng: np.random.Generator) -> Tuple[str, int]:
+        from src.cfr_strategy import create_info_set
+        player = game.players[seat]
+        info_set = create_info_set(player.hole_cards, game.community_cards, '', game.pot, game.stage)
+
+        available_actions = ['fold', 'call']
+        if player.current_bet >= game.current_bet:
+            available_actions = ['fold', 'check', 'raise_small', 'raise_big']
+        action, _ = self.agent.get_action(info_set, available_actions)
+
+        amount = 0
+        if action in ('raise_small', 'raise_half'):
+            amount = int(game.pot) // 2
+        elif action in ('raise_big', 'raise_pot'):
+            amount = int(game.pot)
+        return self.ACTION_MAP[action], amount
+
+
+AGENTS = {
+    'random': RandomAgent,
+    'calling_station': CallingStationAgent,
+    'cfr': CFRPlayerAgent
+}
+
+
+class _SeedStream:
+    # Stands in for a seed chain so every hand's server seed follows from the run seed.
+    def __init__(self, seed: str):
+        self.seed = seed
+        self.counter = 0
+
+    def next_seed(self) -> Tuple[str, None]:
+        self.counter += 1
+        return hashlib.sha256(f"{self.seed}:{self.counter}".encode()).hexdigest(), None
+
+
+@dataclass
+class AgentResult:
+    seat: int
+    agent: str
+    hands: int
+    bb_per_100: float
+    ci_low: float
+    ci_high: float
+
+    def to_dict(self) -> Dict:
+        return {
+            'seat': self.seat,
+            'agent': self.agent,
+            'hands': self.hands,
+            'bb_per_100': self.bb_per_100,
+            'ci': [self.ci_low, self.ci_high]
+        }
+
+
+@dataclass
+class SimulationResult:
+    hands: int
+    seconds: float
+    variant: str
+    agents: List[AgentResult] = field(default_factory=list)
+
+    @property
+    def hands_per_second(self) -> float:
+        return self.hands / self.seconds if self.seconds > 0 else 0.0
+
+    def to_dict(self) -> Dict:
+        return {
+            'hands': self.hands,
+            'seconds': self.seconds,
+            'hands_per_second': self.hands_per_second,
+            'variant': self.variant,
+            'agents': [a.to_dict() for a in self.agents]
+        }
+
+
+def play_hand(game: PokerGame, agents: Sequence[Agent], client_seed: str,
+              rng: np.random.Generator, stack: int) -> List[int]:
+    for player in game.players:
+        player.chips = stack
+    game.deal_hand(client_seed)
+
+    actions = 0
+    while game.stage != 'showdown':
+        seat = game.current_player_index
+        player = game.players[seat]
+        # When nobody can act the engine parks the action on a folded or all-in
+        # seat and the hand would stall, so the remaining streets are dealt out.
+        if player.is_folded or player.is_all_in or actions >= MAX_ACTIONS_PER_HAND:
+            while game.stage != 'showdown':
+                game._next_stage()
+            break
+
+        action, amount = agents[seat].act(game, seat, rng)
+        if game.apply_action(seat, action, amount) is not None:
+            game.apply_action(seat, 'fold')
+        actions += 1
+
+    # Blinds, bets and stacks are whole numbers, and award_pot splits pots in
+    # whole chips, so chip counts stay integral.
+    game.award_pot(whole_chips=True)
+    return [int(player.chips) - stack for player in game.players]
+
+
+def _simulate_chunk(args) -> Tuple[np.ndarray, np.ndarray, int]:
+    agent_names, hands, seed_entropy, first_hand, variant, stack, small_blind, big_blind = args
+    seed_seq = np.random.SeedSequence(seed_entropy)
+    rng = np.random.default_rng(seed_seq)
+    # CFRAgent samples actions from the global NumPy generator.
+    np.random.seed(seed_seq.generate_state(1)[0])
+
+    agents = [AGENTS[name]() for name in agent_names]
+    game = PokerGame('simulation', variant, _SeedStream(f"{seed_entropy}"))
+    game.small_blind = small_blind
+    game.big_blind = big_blind
+    for seat, name in enumerate(agent_names):
+        game.add_player(f"seat_{seat}", name, chips=stack)
+
+    totals = np.zeros(len(agents))
+    squares = np.zeros(len(agents))
+    for hand in range(first_hand, first_hand + hands):
+        game.dealer_index = hand % len(agents)
+        game.request_commitment()
+        deltas = np.array(play_hand(game, agents, str(hand), rng, stack))
+        totals += deltas
+        squares += deltas * deltas
+    return totals, squares, hands
+
+
+def simulate(agent_names: Sequence[str], hands: int, seed: int = 0,
+             workers: Optional[int] = None, variant: str = 'holdem',
+             stack: int = DEFAULT_STACK, small_blind: int = DEFAULT_SMALL_BLIND,
+             big_blind: int = DEFAULT_BIG_BLIND) -> SimulationResult:
+    agent_names = list(agent_names)
+    if len(agent_names) < 2:
+        raise ValueError("A simulation needs at least two agents")
+    unknown = [name for name in agent_names if name not in AGENTS]
+    if unknown:
+        raise ValueError(f"Unknown agents: {unknown}")
+
+    # Chunks and their seeds depend only on the hand count, so a run is
+    # reproducible for a given seed whatever the number of workers.
+    sizes = [min(CHUNK_HANDS, hands - i) for i in range(0, hands, CHUNK_HANDS)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    chunks = [(agent_names, size, int(chunk_seed.generate_state(1, np.uint64)[0]), i * CHUNK_HANDS,
+               variant, stack, small_blind, big_blind)
+              for i, (size, chunk_seed) in enumerate(zip(sizes, seeds))]
+
+    totals = np.zeros(len(agent_names))
+    squares = np.zeros(len(agent_names))
+    played = 0
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        for chunk_totals, chunk_squares, chunk_hands in pool.map(_simulate_chunk, chunks):
+            totals += chunk_totals
+            squares += chunk_squares
+            played += chunk_hands
+    seconds = time.perf_counter() - start
+
+    result = SimulationResult(hands=played, seconds=seconds, variant=variant)
+    for seat, name in enumerate(agent_names):
+        mean = totals[seat] / played
+        variance = max(0.0, squares[seat] / played - mean * mean)
+        std_error = np.sqrt(variance / played)
+        scale = 100.0 / big_blind
+        result.agents.append(AgentResult(
+            seat=seat,
+            agent=name,
+            hands=played,
+            bb_per_100=float(mean * scale),
+            ci_low=float((mean - Z_95 * std_error) * scale),
+            ci_high=float((mean + Z_95 * std_error) * scale)
+        ))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Headless self-play simulator')
+    parser.add_argument('agents', nargs='+', choices=list(AGENTS))
+    parser.add_argument('--hands', type=int, default=100000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--variant', choices=list(PokerGame.HOLE_CARDS), default='holdem')
+    parser.add_argument('--stack', type=int, default=DEFAULT_STACK)
+    parser.add_argument('--small-blind', type=int, default=DEFAULT_SMALL_BLIND)
+    parser.add_argument('--big-blind', type=int, default=DEFAULT_BIG_BLIND)
+    args = parser.parse_args()
+
+    result = simulate(args.agents, args.hands, args.seed, args.workers, args.variant,
+                      args.stack, args.small_blind, args.big_blind)
+    print(f"{result.hands} hands in {result.seconds:.1f}s ({result.hands_per_second:.0f} hands/sec)")
+    for agent in result.agents:
+        print(f"  seat {agent.seat} {agent.agent:<16} {agent.bb_per_100:+9.2f} bb/100 "
+              f"(95% CI {agent.ci_low:+.2f} .. {agent.ci_high:+.2f})")
+
+
+if __name__ == '__main__':
+    main()
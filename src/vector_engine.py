@@ -0,0 +1,327 @@
+import argparse
+import sys
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.poker_engine import CURRENT_SHUFFLE_VERSION, CommitRevealDeck, HandEvaluator, PokerGame
+
+
+FOLD, CHECK, CALL, RAISE, ALL_IN = range(5)
+ACTIONS = ['fold', 'check', 'call', 'raise', 'all_in']
+ACTION_CODES = {name: code for code, name in enumerate(ACTIONS)}
+
+PREFLOP, FLOP, TURN, RIVER, SHOWDOWN = range(5)
+STAGE_DEALS = {FLOP: 3, TURN: 1, RIVER: 1}
+
+
+# K tables with the same seat count held as arrays and stepped together. Every
+# rule, including PokerGame's quirks (no side pots, current_bet following a short
+# raise, action parked on seat 0 when nobody can act), is reproduced exactly so
+# results match PokerGame for the same seeds and actions.
+class VectorGame:
+    def __init__(self, num_tables: int, num_players: int, chips: float = 1000.0,
+                 small_blind: float = 5.0, big_blind: float = 10.0, variant: str = 'holdem'):
+        if variant not in PokerGame.HOLE_CARDS:
+            raise ValueError(f"Unknown game variant: {variant}")
+        self.variant = variant
+        self.hole_count = PokerGame.HOLE_CARDS[variant]
+        if num_players < 2 or num_players * self.hole_count + 5 > 52:
+            raise ValueError(f"Unsupported number of players: {num_players}")
+
+        k, n = num_tables, num_players
+        self.num_tables = k
+        self.num_players = n
+        self.small_blind = small_blind
+        self.big_blind = big_blind
+        self.tables = np.arange(k)
+
+        self.chips = np.full((k, n), chips, dtype=np.float64)
+        self.bets = np.zeros((k, n), dtype=np.float64)
+        self.folded = np.zeros((k, n), dtype=bool)
+        self.all_in = np.zeros((k, n), dtype=bool)
+        self.pot = np.zeros(k, dtype=np.float64)
+        self.current_bet = np.zeros(k, dtype=np.float64)
+        self.last_raise_amount = np.zeros(k, dtype=np.float64)
+        self.stage = np.full(k, PREFLOP, dtype=np.int64)
+        self.current_player = np.zeros(k, dtype=np.int64)
+        self.dealer = np.zeros(k, dtype=np.int64)
+        self.actions_this_round = np.zeros(k, dtype=np.int64)
+
+        self.decks = np.zeros((k, 52), dtype=np.uint8)
+        self.deck_index = np.zeros(k, dtype=np.int64)
+        self.hole = np.zeros((k, n, self.hole_count), dtype=np.int64)
+        self.board = np.full((k, 5), -1, dtype=np.int64)
+        self.board_count = np.zeros(k, dtype=np.int64)
+
+    def start_hands(self, server_seeds: Sequence[str], client_seeds: Sequence[str],
+                    shuffle_version: int = CURRENT_SHUFFLE_VERSION):
+        k, n = self.num_tables, self.num_players
+        self.decks = CommitRevealDeck.shuffle_batch(list(server_seeds), list(client_seeds), shuffle_version)
+        dealt = n * self.hole_count
+        self.hole = self.decks[:, :dealt].astype(np.int64).reshape(k, n, self.hole_count)
+        self.deck_index[:] = dealt
+        self.board[:] = -1
+        self.board_count[:] = 0
+
+        self.pot[:] = 0.0
+        self.current_bet[:] = 0.0
+        self.stage[:] = PREFLOP
+        self.actions_this_round[:] = 0
+        self.bets[:] = 0.0
+        self.folded[:] = False
+        self.all_in[:] = False
+
+        sb = (self.dealer + 1) % n
+        bb = (self.dealer + 2) % n
+        self._make_bets(self.tables, sb, np.full(k, self.small_blind))
+        self._make_bets(self.tables, bb, np.full(k, self.big_blind))
+        self.current_bet[:] = self.big_blind
+        self.current_player = (bb + 1) % n
+
+    def _make_bets(self, tables: np.ndarray, seats: np.ndarray, amounts: np.ndarray):
+        actual = np.minimum(amounts, self.chips[tables, seats])
+        self.chips[tables, seats] -= actual
+        self.bets[tables, seats] += actual
+        self.pot[tables] += actual
+        self.all_in[tables, seats] |= self.chips[tables, seats] == 0
+
+    def step(self, actions: np.ndarray, amounts: Optional[np.ndarray] = None,
+             seats: Optional[np.ndarray] = None, mask: Optional[np.ndarray] = None) -> np.ndarray:
+        actions = np.asarray(actions, dtype=np.int64)
+        amounts = np.zeros(self.num_tables) if amounts is None else np.asarray(amounts, dtype=np.float64)
+        seats = self.current_player.copy() if seats is None else np.asarray(seats, dtype=np.int64)
+        live = self.stage != SHOWDOWN
+        if mask is not None:
+            live &= mask
+
+        t = self.tables
+        seat_folded = self.folded[t, seats]
+        errors = live & (seat_folded | ((actions == CHECK) & (self.bets[t, seats] < self.current_bet)))
+        ok = live & ~errors
+
+        m = ok & (actions == FOLD)
+        self.folded[t[m], seats[m]] = True
+
+        m = ok & (actions == CALL)
+        tm, sm = t[m], seats[m]
+        self._make_bets(tm, sm, self.current_bet[m] - self.bets[tm, sm])
+
+        m = ok & (actions == RAISE)
+        tm, sm = t[m], seats[m]
+        call = self.current_bet[m] - self.bets[tm, sm]
+        raise_by = amounts[m]
+        if self.variant == 'omaha':
+            raise_by = np.minimum(raise_by, self.pot[m] + call)
+        self._make_bets(tm, sm, call + raise_by)
+        self.current_bet[m] = self.bets[tm, sm]
+        self.last_raise_amount[m] = raise_by
+
+        m = ok & (actions == ALL_IN)
+        tm, sm = t[m], seats[m]
+        all_in_amount = self.chips[tm, sm]
+        if self.variant == 'omaha':
+            call = self.current_bet[m] - self.bets[tm, sm]
+            all_in_amount = np.minimum(all_in_amount, call + self.pot[m] + call)
+        self._make_bets(tm, sm, all_in_amount)
+        self.current_bet[m] = np.maximum(self.current_bet[m], self.bets[tm, sm])
+
+        self.actions_this_round[ok] += 1
+        self._move_to_next_player(ok)
+        self._advance(ok)
+        return errors
+
+    def _next_actor(self, start: np.ndarray, offsets: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        seats = (start[:, None] + offsets[None, :]) % self.num_players
+        rows = self.tables[:, None]
+        eligible = ~self.folded[rows, seats] & ~self.all_in[rows, seats]
+        found = eligible.any(axis=1)
+        return np.where(found, seats[self.tables, eligible.argmax(axis=1)], 0), found
+
+    def _move_to_next_player(self, mask: np.ndarray):
+        nxt, _ = self._next_actor(self.current_player, np.arange(1, self.num_players + 1))
+        self.current_player = np.where(mask, nxt, self.current_player)
+
+    def _advance(self, mask: np.ndarray):
+        active = (~self.folded).sum(axis=1)
+        self.stage[mask & (active == 1)] = SHOWDOWN
+        settled = (self.bets == self.current_bet[:, None]) | self.all_in | self.folded
+        complete = mask & (active != 1) & settled.all(axis=1) & (self.actions_this_round >= active)
+        self.next_stage(complete)
+
+    def next_stage(self, mask: np.ndarray):
+        m = mask & (self.stage < SHOWDOWN)
+        self.stage[m] += 1
+        self.bets[m] = 0.0
+        self.current_bet[m] = 0.0
+        self.actions_this_round[m] = 0
+
+        for stage, count in STAGE_DEALS.items():
+            dealing = np.flatnonzero(m & (self.stage == stage))
+            for i in range(count):
+                self.board[dealing, self.board_count[dealing] + i] = self.decks[dealing, self.deck_index[dealing] + i]
+            self.board_count[dealing] += count
+            self.deck_index[dealing] += count
+
+        acting = m & (self.stage != SHOWDOWN)
+        first, _ = self._next_actor(np.zeros(self.num_tables, dtype=np.int64), np.arange(self.num_players))
+        self.current_player = np.where(acting, first, self.current_player)
+
+    def run_out(self, mask: Optional[np.ndarray] = None):
+        mask = np.ones(self.num_tables, dtype=bool) if mask is None else mask
+        while (mask & (self.stage != SHOWDOWN)).any():
+            self.next_stage(mask)
+
+    def hand_strengths(self) -> np.ndarray:
+        k, n = self.num_tables, self.num_players
+        strengths = np.full((k, n), -1, dtype=np.int64)
+        full = self.board_count == 5
+        if not full.any():
+            return strengths
+        boards = np.repeat(self.board[full], n, axis=0)
+        holes = self.hole[full].reshape(-1, self.hole_count)
+        if self.variant == 'omaha':
+            values = HandEvaluator.evaluate_omaha_batch(holes, boards)
+        else:
+            values = HandEvaluator.evaluate_batch(np.concatenate([holes, boards], axis=1))
+        strengths[full] = values.reshape(-1, n)
+        return strengths
+
+    def award_pots(self) -> np.ndarray:
+        active = ~self.folded
+        num_active = active.sum(axis=1)
+        strengths = np.where(active, self.hand_strengths(), -1)
+        best = strengths.max(axis=1)
+        winners = np.where((num_active == 1)[:, None], active, active & (strengths == best[:, None]))
+        winners &= (num_active > 0)[:, None]
+
+        shares = np.zeros(self.num_tables)
+        has_winner = num_active > 0
+        shares[has_winner] = self.pot[has_winner] / winners[has_winner].sum(axis=1)
+        self.chips += np.where(winners, shares[:, None], 0.0)
+        return winners
+
+
+class _FixedSeed:
+    def __init__(self, seed: str):
+        self.seed = seed
+
+    def next_seed(self) -> Tuple[str, None]:
+        return self.seed, None
+
+
+def _compare(vg: VectorGame, games: List[PokerGame]) -> List[str]:
+    problems = []
+    for i, game in enumerate(games):
+        state = {
+            'stage': PokerGame.STAGES.index(game.stage),
+            'pot': game.pot,
+            'current_bet': game.current_bet,
+            'current_player': game.current_player_index,
+            'actions_this_round': game.actions_this_round,
+            'chips': [p.chips for p in game.players],
+            'bets': [p.current_bet for p in game.players],
+            'folded': [p.is_folded for p in game.players],
+            'all_in': [p.is_all_in for p in game.players],
+            'folded_count': game.folded_count,
+            'all_in_count': game.all_in_count,
+            'active_count': game.active_count,
+            'board': [c.id for c in game.community_cards],
+            'hole': [[c.id for c in p.hole_cards] for p in game.players]
+        }
+        vector = {
+            'stage': int(vg.stage[i]),
+            'pot': float(vg.pot[i]),
+            'current_bet': float(vg.current_bet[i]),
+            'current_player': int(vg.current_player[i]),
+            'actions_this_round': int(vg.actions_this_round[i]),
+            'chips': vg.chips[i].tolist(),
+            'bets': vg.bets[i].tolist(),
+            'folded': vg.folded[i].tolist(),
+            'all_in': vg.all_in[i].tolist(),
+            'folded_count': int(vg.folded[i].sum()),
+            'all_in_count': int((vg.all_in[i] & ~vg.folded[i]).sum()),
+            'active_count': int((~vg.folded[i]).sum()),
+            'board': vg.board[i, :vg.board_count[i]].tolist(),
+            'hole': vg.hole[i].tolist()
+        }
+        for key, value in state.items():
+            if value != vector[key]:
+                problems.append(f"table {i} {key}: PokerGame {value} != VectorGame {vector[key]}")
+    return problems
+
+
+def parity_check(num_tables: int = 200, num_players: int = 3, hands: int = 5, seed: int = 0,
+                 variant: str = 'holdem', max_steps: int = 200) -> List[str]:
+    rng = np.random.default_rng(seed)
+    vg = VectorGame(num_tables, num_players, variant=variant)
+    games = []
+    for i in range(num_tables):
+        game = PokerGame(f"table_{i}", variant)
+        for seat in range(num_players):
+            game.add_player(f"seat_{seat}", f"Seat {seat}")
+        games.append(game)
+
+    amount_choices = np.array([0.0, 5.0, 10.0, 37.5, 100.0, 2000.0])
+    for hand in range(hands):
+        server_seeds = [f"server-{seed}-{hand}-{i}" for i in range(num_tables)]
+        client_seeds = [f"client-{seed}-{hand}-{i}" for i in range(num_tables)]
+        vg.dealer[:] = hand % num_players
+        vg.start_hands(server_seeds, client_seeds)
+        for i, game in enumerate(games):
+            game.dealer_index = hand % num_players
+            game.deck.seed_chain = _FixedSeed(server_seeds[i])
+            game.request_commitment()
+            game.deal_hand(client_seeds[i])
+
+        problems = _compare(vg, games)
+        for _ in range(max_steps):
+            if problems or (vg.stage == SHOWDOWN).all():
+                break
+            actions = rng.integers(0, len(ACTIONS), num_tables)
+            amounts = amount_choices[rng.integers(0, len(amount_choices), num_tables)]
+            seats = np.where(rng.random(num_tables) < 0.9, vg.current_player,
+                             rng.integers(0, num_players, num_tables))
+            # Folds are rarer so hands reach later streets.
+            actions = np.where((actions == FOLD) & (rng.random(num_tables) < 0.7), CALL, actions)
+
+            errors = vg.step(actions, amounts, seats)
+            for i, game in enumerate(games):
+                if game.stage == 'showdown':
+                    continue
+                error = game.apply_action(int(seats[i]), ACTIONS[actions[i]], float(amounts[i]))
+                if (error is not None) != bool(errors[i]):
+                    problems.append(f"table {i}: error mismatch ({error!r} vs {bool(errors[i])})")
+            problems += _compare(vg, games)
+
+        vg.run_out()
+        for game in games:
+            while game.stage != 'showdown':
+                game._next_stage()
+        vg.award_pots()
+        for game in games:
+            game.award_pot()
+        problems += _compare(vg, games)
+        if problems:
+            return [f"hand {hand}: {p}" for p in problems]
+    return []
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check VectorGame against PokerGame on random seeded action sequences')
+    parser.add_argument('--tables', type=int, default=200)
+    parser.add_argument('--players', type=int, default=3)
+    parser.add_argument('--hands', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--variant', choices=list(PokerGame.HOLE_CARDS), default='holdem')
+    args = parser.parse_args()
+
+    problems = parity_check(args.tables, args.players, args.hands, args.seed, args.variant)
+    for problem in problems[:20]:
+        print(problem)
+    print(f"{'FAIL' if problems else 'OK'}: {args.tables} tables x {args.hands} hands, {args.players} players")
+    sys.exit(1 if problems else 0)
+
+
+if __name__ == '__main__':
+    main()